@@ -2,12 +2,23 @@ import streamlit as st
 # Page configuration
 import pandas as pd
 import json
-from datetime import datetime
+from datetime import datetime, time as dtime
 import os
+import hashlib
+import threading
 from PIL import Image
 from pathlib import Path
 from io import BytesIO
 from zoneinfo import ZoneInfo
+from cart import cart_keys, fmt_money, quote_cart, uom_allowed, unit_price
+from catalog_bin import MappedCatalog, compile_catalog
+from catalog_sync import CatalogSync
+import jobs
+from jobs import JobQueue, job_handler
+from order_index import OrderIndex
+from products import (filter_products, normalize_products, product_categories, products_from_df,
+                      validate_products_df)
+from storage import CodecUnavailableError, decode_data, encode_data
 APP_TZ = os.getenv("APP_TIMEZONE", "America/Chicago")
 
 st.set_page_config(
@@ -28,7 +39,9 @@ def load_json(name: str, default):
     p = _path(name)
     try:
         if p.exists():
-            return json.loads(p.read_text(encoding="utf-8"))
+            return decode_data(p.read_bytes())
+    except CodecUnavailableError:
+        raise  # data is fine but unreadable here; never fall back and overwrite it
     except Exception:
         pass  # corrupted file → fall back
     return default
@@ -36,11 +49,13 @@ def load_json(name: str, default):
 def save_json(name: str, obj):
     p = _path(name)
     tmp = p.with_suffix(p.suffix + ".tmp")
-    tmp.write_text(json.dumps(obj, ensure_ascii=False, indent=2), encoding="utf-8")
+    tmp.write_bytes(encode_data(obj))
     tmp.replace(p)
 
 USERS_FILE = "users.json"
 PRODUCTS_FILE = "products.json"
+PRODUCTS_BIN_FILE = "products.bin"  # compiled, mmap-able copy of products.json
+CATALOG_SYNC_STATE_FILE = "catalog_sync.json"  # markers of the last synced catalog version
 ORDERS_FILE = "orders.json"
 
 # excel helper
@@ -53,18 +68,210 @@ def df_to_excel_bytes(df: pd.DataFrame, sheet_name: str = "Sheet1") -> bytes:
 
 def load_data():
     st.session_state.users_db    = load_json(USERS_FILE, {})
-    st.session_state.products_db = load_json(PRODUCTS_FILE, [])
+    catalog = get_catalog()
+    catalog.reload_if_changed()
+    st.session_state.products_db = catalog.products
     st.session_state.orders_db   = load_json(ORDERS_FILE, [])
+    get_order_index().sync(st.session_state.orders_db)
 
 def save_users():
     save_json(USERS_FILE, st.session_state.users_db)
 
 def save_products():
-    save_json(PRODUCTS_FILE, st.session_state.products_db)
+    get_catalog().swap(st.session_state.products_db)
 
 def save_orders():
     save_json(ORDERS_FILE, st.session_state.orders_db)
 
+# --- order search index ---
+@st.cache_resource
+def get_order_index() -> OrderIndex:
+    """Process-wide order index shared by all sessions."""
+    return OrderIndex()
+
+# --- catalog ---
+class Catalog:
+    """Current product list shared by all sessions of this process.
+
+    Readers take `catalog.products` once per rerun; `swap()` replaces the
+    whole list in one assignment, so a session never sees a half-updated
+    catalog. Other processes pick up the new version via products.json.
+    Products are normalized on the way in, so the list and the mapped
+    products.bin always agree.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.products = []
+        self.by_code = {}
+        self.version = 0
+        self._stamp = None
+        self.line_cache = {}  # (item_code, uom, qty) -> priced cart line
+
+    @staticmethod
+    def _file_stamp():
+        try:
+            st_ = _path(PRODUCTS_FILE).stat()
+            return (st_.st_mtime_ns, st_.st_size)
+        except OSError:
+            return None
+
+    def reload_if_changed(self):
+        """Re-read products.json only if it changed on disk.
+
+        If products.bin was compiled from this exact products.json, it is
+        memory-mapped instead of parsing the JSON.
+        """
+        stamp = self._file_stamp()
+        if stamp == self._stamp:
+            return
+        with self._lock:
+            if stamp == self._stamp:
+                return
+            products = self._open_compiled(stamp)
+            if products is None:
+                products = normalize_products(load_json(PRODUCTS_FILE, []))
+                if stamp is not None:
+                    self._compile(products, stamp)
+            self._set(products, stamp)
+
+    def swap(self, products: list, persist: bool = True):
+        """Atomically replace the catalog (and persist it for other processes)."""
+        products = normalize_products(products)
+        with self._lock:
+            if persist:
+                save_json(PRODUCTS_FILE, products)
+                stamp = self._file_stamp()
+                self._compile(products, stamp)
+            else:
+                stamp = self._file_stamp()
+            self._set(products, stamp)
+
+    @staticmethod
+    def _open_compiled(stamp):
+        try:
+            mapped = MappedCatalog(_path(PRODUCTS_BIN_FILE))
+        except Exception:
+            return None  # missing, truncated or torn: parse products.json instead
+        return mapped if stamp is not None and mapped.source_stamp == stamp else None
+
+    @staticmethod
+    def _compile(products, stamp):
+        try:
+            compile_catalog(products, _path(PRODUCTS_BIN_FILE), stamp)
+        except OSError:
+            pass  # workers fall back to parsing products.json
+
+    def _set(self, products, stamp):
+        if isinstance(products, MappedCatalog):
+            by_code = products.by_code
+        else:
+            by_code = {p.get('item_code'): p for p in products}
+        self.products, self.by_code, self.line_cache = products, by_code, {}
+        self.version += 1
+        self._stamp = stamp
+
+    def snapshot(self):
+        """(version, by_code, line_cache) taken together for one consistent read."""
+        with self._lock:
+            return self.version, self.by_code, self.line_cache
+
+@st.cache_resource
+def get_catalog() -> Catalog:
+    """Process-wide catalog shared by all sessions."""
+    return Catalog()
+
+# --- scheduled catalog sync ---
+# CATALOG_SOURCE may be a local CSV path or an http(s) URL (e.g. a published
+# Google Sheet CSV export). Sync is off when it is empty.
+CATALOG_SOURCE = os.getenv("CATALOG_SOURCE", "")
+CATALOG_SYNC_SECONDS = int(os.getenv("CATALOG_SYNC_SECONDS", "300"))
+
+def apply_catalog_csv(data: bytes):
+    """Parse, validate and swap in a synced catalog CSV (raises on invalid data)"""
+    df = pd.read_csv(BytesIO(data))
+    validate_products_df(df)
+    get_catalog().swap(products_from_df(df))
+
+@st.cache_resource
+def get_catalog_sync():
+    """Start the background catalog sync once per process (None if not configured)."""
+    if not CATALOG_SOURCE:
+        return None
+    sync = CatalogSync(CATALOG_SOURCE, apply_catalog_csv, CATALOG_SYNC_SECONDS, tz=ZoneInfo(APP_TZ),
+                       state_path=_path(CATALOG_SYNC_STATE_FILE))
+    sync.start()
+    return sync
+
+# --- cart engine ---
+def price_cart(cart: dict) -> dict:
+    """Validate and price every cart line against the current catalog version.
+
+    Lines are memoized per catalog version (see cart.quote_cart); the whole
+    quote is cached in session state per (cart contents, catalog version).
+    """
+    version, by_code, line_cache = get_catalog().snapshot()
+    keys = cart_keys(cart)
+    cache_key = (keys, version)
+    cached = st.session_state.get("cart_quote")
+    if cached and cached[0] == cache_key:
+        return cached[1]
+    quote = quote_cart(keys, version, by_code, line_cache)
+    st.session_state.cart_quote = (cache_key, quote)
+    return quote
+
+# --- post-submit jobs ---
+# Work triggered by an order (warehouse Excel, emails, ERP webhook) is queued
+# on disk and run by background workers (see jobs.py), so submit_order() only
+# pays for writing one small file per job.
+JOBS_DIR = DATA_DIR / "jobs"
+EXPORTS_DIR = DATA_DIR / "order_exports"
+
+@st.cache_resource
+def get_job_queue() -> JobQueue:
+    """Start the post-submit workers once per process."""
+    queue = JobQueue(JOBS_DIR)
+    queue.start()
+    return queue
+
+def order_items_df(order: dict) -> pd.DataFrame:
+    """Line items table for one order (admin view and warehouse export)"""
+    return pd.DataFrame([
+        {
+            "Item Code": it.get("item_code",""),
+            "Description": it.get("description",""),
+            "Brand": it.get("brand",""),
+            "UOM": it.get("uom",""),
+            "Quantity": it.get("quantity",0),
+            "Unit Price": it.get("unit_price"),
+            "Line Total": it.get("line_total"),
+        }
+        for it in order.get("items", [])
+    ])
+
+def order_export_path(order_id: str) -> Path:
+    return EXPORTS_DIR / f"{order_id}.xlsx"
+
+@job_handler("order_excel")
+def _job_order_excel(payload: dict):
+    order = payload["order"]
+    EXPORTS_DIR.mkdir(exist_ok=True)
+    p = order_export_path(order["order_id"])
+    tmp = p.with_suffix(".tmp")
+    tmp.write_bytes(df_to_excel_bytes(order_items_df(order), sheet_name="OrderItems"))
+    tmp.replace(p)
+
+def enqueue_order_jobs(order: dict):
+    """Queue the configured post-submit jobs for a new order"""
+    queue = get_job_queue()
+    kinds = ["order_excel"]
+    if jobs.SMTP_HOST:
+        kinds.append("order_email")
+    if jobs.ORDER_WEBHOOK_URL:
+        kinds.append("order_webhook")
+    for kind in kinds:
+        queue.enqueue(kind, {"order": order})
+
 # Baseline defaults
 st.session_state.setdefault("logged_in", False)
 st.session_state.setdefault("user_data", {})
@@ -77,6 +284,8 @@ st.session_state.setdefault("last_product_id", None)
 st.session_state.setdefault("show_filters", False)
 
 # Load persisted data (overwrites the empty defaults if files exist)
+get_catalog_sync()
+get_job_queue()
 load_data()
 
 st.markdown("""
@@ -367,7 +576,7 @@ def product_catalog_page():
         # Prefer a compact popover if available; fallback to a toggle+expander
         try:
             with st.popover("Filter", use_container_width=True):
-                categories_all = list(set([p.get('category', 'Uncategorized') for p in st.session_state.products_db]))
+                categories_all = product_categories(st.session_state.products_db)
                 selected_category = st.selectbox("Category", ["All"] + categories_all, key="filter_category")
         except Exception:
             if st.button("Filter", use_container_width=True):
@@ -375,28 +584,27 @@ def product_catalog_page():
 
     # Fallback filter panel (only if popover not available or user toggled)
     if "selected_category" not in locals():
-        categories_all = list(set([p.get('category', 'Uncategorized') for p in st.session_state.products_db]))
+        categories_all = product_categories(st.session_state.products_db)
         if st.session_state.get("show_filters", False):
             with st.expander("Filters", expanded=True):
                 selected_category = st.selectbox("Category", ["All"] + categories_all, key="filter_category_fallback")
         else:
             selected_category = "All"
 
-    # View Cart button (below search+filter)
-    if st.button("🛒 View Cart", use_container_width=True):
-        st.session_state.current_page = 'cart'
-        st.rerun()
+    # View Cart / My Orders buttons (below search+filter)
+    n1, n2 = st.columns(2)
+    with n1:
+        if st.button("🛒 View Cart", use_container_width=True):
+            st.session_state.current_page = 'cart'
+            st.rerun()
+    with n2:
+        if st.button("📜 My Orders", use_container_width=True):
+            st.session_state.current_page = 'history'
+            st.session_state.history_page = 0
+            st.rerun()
 
     # --- Apply filters ---
-    filtered_products = st.session_state.products_db
-    if search_query:
-        filtered_products = [
-            p for p in filtered_products
-            if search_query.lower() in p.get('item_code', '').lower()
-            or search_query.lower() in p.get('description', '').lower()
-        ]
-    if selected_category != "All":
-        filtered_products = [p for p in filtered_products if p.get('category') == selected_category]
+    filtered_products = filter_products(st.session_state.products_db, search_query, selected_category)
 
     # --- Render products ---
     if not filtered_products:
@@ -520,6 +728,10 @@ def product_detail_page():
         key=f"uom_{pid}"
     )
 
+    price = unit_price(product, selected_uom)
+    if price is not None:
+        st.markdown(f"**Price:** {fmt_money(price)} / {selected_uom}")
+
     # Quantity
     qty_key = f"qty_{pid}"
     if qty_key not in st.session_state:
@@ -555,22 +767,40 @@ def cart_page():
     if st.button("← Back to Catalog"):
         st.session_state.current_page = 'catalog'
         st.rerun()
+
+    msg = st.session_state.pop("reorder_message", None)
+    if msg:
+        st.info(msg)
     
     if not st.session_state.cart:
         st.info("Your cart is empty. Start shopping!")
         return
 
+    # Apply pending quantity edits before pricing so totals match the inputs
+    for cart_key, item in st.session_state.cart.items():
+        pending = st.session_state.get(f"cart_qty_{cart_key}")
+        if pending is not None:
+            item['quantity'] = int(pending)
+
+    quote = price_cart(st.session_state.cart)
+    lines = {ln["item_code"]: ln for ln in quote["lines"]}
+
     # Display cart items
     st.subheader(f"Items in Cart: {len(st.session_state.cart)}")
 
     # Compact single-line cart display
     for cart_key, item in list(st.session_state.cart.items()):
-        c1, c2, c3, c4, c5, c6 = st.columns([1.2, 2.5, 1, 0.8, 0.8, 0.7])
+        line = lines.get(cart_key, {})
+        c1, c2, c3, c4, c5, c6, c7 = st.columns([1.2, 2.5, 1, 0.8, 0.8, 0.9, 0.7])
 
         with c1:
             st.markdown(f"**{item.get('item_code','')}**")
         with c2:
             st.write(ellipsize(item.get('description', ''), max_chars=35))
+            if line.get("status") == "removed":
+                st.caption("⚠️ No longer available — will not be ordered")
+            elif line.get("status") == "invalid_uom":
+                st.caption(f"⚠️ Not sold by {item.get('uom','')} anymore — will not be ordered")
         with c3:
             st.write(item.get('brand', '—'))
         with c4:
@@ -587,11 +817,26 @@ def cart_page():
             if new_qty != item['quantity']:
                 st.session_state.cart[cart_key]['quantity'] = new_qty
         with c6:
+            st.write(fmt_money(line.get("line_total")))
+        with c7:
             if st.button("🗑️", key=f"remove_{cart_key}", use_container_width=True):
                 del st.session_state.cart[cart_key]
                 st.rerun()
 
     st.divider()
+
+    # Totals (only lines that will actually be ordered)
+    if quote["valid"] and quote["unpriced"] < len(quote["valid"]):
+        t1, t2, t3 = st.columns(3)
+        t1.metric("Cases", fmt_money(quote["case_total"]))
+        t2.metric("Each", fmt_money(quote["each_total"]))
+        t3.metric("Total", fmt_money(quote["total"]))
+        if quote["unpriced"]:
+            st.caption(f"{quote['unpriced']} item(s) have no price and are not included in the total.")
+    if quote["invalid"]:
+        st.warning(f"{len(quote['invalid'])} item(s) in your cart are no longer available as selected and will be left out of the order.")
+
+    st.divider()
     
     # Send order button (green via CSS)
     st.markdown('<div class="send-order">', unsafe_allow_html=True)
@@ -614,22 +859,142 @@ def cart_page():
                 st.session_state.show_order_confirmation = False
                 st.rerun()
 
+def add_items_to_cart(items) -> tuple[int, list[str]]:
+    """Add previously ordered lines to the cart, checked against the current catalog.
+
+    Returns (number added, list of skipped item codes with the reason).
+    """
+    products = get_catalog().by_code
+    added, skipped = 0, []
+    for it in items:
+        code = it.get("item_code", "")
+        product = products.get(code)
+        uom = it.get("uom", "")
+        if product is None:
+            skipped.append(f"{code} (no longer available)")
+        elif not uom_allowed(product, uom):
+            skipped.append(f"{code} (not sold by {uom})")
+        elif code in st.session_state.cart:
+            skipped.append(f"{code} (already in cart)")
+        else:
+            st.session_state.cart[code] = {
+                "item_code": code,
+                "description": product.get("description", ""),
+                "brand": (product.get("brand") or "").strip(),
+                "uom": uom,
+                "quantity": max(1, int(it.get("quantity", 1))),
+            }
+            added += 1
+    return added, skipped
+
+def order_history_page():
+    """Customer order history with one-tap reorder"""
+    st.title("My Orders")
+
+    if st.button("← Back to Catalog", use_container_width=True, key="history_back"):
+        st.session_state.current_page = 'catalog'
+        st.rerun()
+
+    # Feedback from the last reorder tap (set before rerun)
+    msg = st.session_state.pop("reorder_message", None)
+    if msg:
+        st.info(msg)
+
+    email = st.session_state.user_data.get('email', '')
+    index = get_order_index()
+
+    def reorder(items):
+        added, skipped = add_items_to_cart(items)
+        text = f"Added {added} item(s) to your cart."
+        if skipped:
+            text += " Skipped: " + ", ".join(skipped)
+        st.session_state.reorder_message = text
+        st.session_state.current_page = 'cart' if added else 'history'
+        st.rerun()
+
+    # ---- Favorites ----
+    favorites = index.top_items(email, n=10)
+    if favorites:
+        st.subheader("⭐ Your usual items")
+        for fav in favorites:
+            c1, c2, c3 = st.columns([3, 1.5, 1])
+            with c1:
+                st.markdown(f"**{fav['item_code']}** {ellipsize(fav['description'], 35)}")
+            with c2:
+                st.write(f"{fav['quantity']} × {fav['uom']}")
+            with c3:
+                if st.button("➕", key=f"fav_add_{fav['item_code']}", use_container_width=True):
+                    reorder([fav])
+        if st.button("🛒 Add all usual items", use_container_width=True, key="fav_add_all"):
+            reorder(favorites)
+        st.divider()
+
+    # ---- Past orders ----
+    page_size = 20
+    page = st.session_state.get("history_page", 0)
+    total, orders, page = index.search(email=email, page=page, page_size=page_size)
+    if not total:
+        st.info("You have not placed any orders yet.")
+        return
+
+    n_pages = -(-total // page_size)
+    st.subheader(f"Past orders ({total})")
+    if n_pages > 1:
+        h1, h2, h3 = st.columns([1, 2, 1])
+        with h1:
+            if st.button("← Newer", use_container_width=True, disabled=page == 0, key="history_newer"):
+                st.session_state.history_page = page - 1
+                st.rerun()
+        with h2:
+            st.caption(f"Page {page + 1} of {n_pages}")
+        with h3:
+            if st.button("Older →", use_container_width=True, disabled=page >= n_pages - 1, key="history_older"):
+                st.session_state.history_page = page + 1
+                st.rerun()
+    for o in orders:
+        items = o.get("items", [])
+        with st.expander(f"{o['order_id']} · {o['timestamp']} · {len(items)} item(s)"):
+            for it in items:
+                st.write(f"{it.get('item_code','')} — {ellipsize(it.get('description',''), 35)} · "
+                         f"{it.get('quantity',0)} × {it.get('uom','')}")
+            if st.button("🔁 Reorder", key=f"reorder_{o['order_id']}", use_container_width=True):
+                reorder(items)
+
 def submit_order():
     """Submit the order (timestamp in local timezone)"""
+    # Re-validate against the catalog at submit time; stale lines are dropped
+    quote = price_cart(st.session_state.cart)
+    if not quote["valid"]:
+        st.session_state.show_order_confirmation = False
+        st.error("None of the items in your cart can be ordered anymore.")
+        return
+
     now_local = datetime.now(ZoneInfo(APP_TZ))
     ts_str = now_local.strftime('%Y-%m-%d %H:%M:%S')
 
+    items = []
+    for ln in quote["valid"]:
+        item = dict(st.session_state.cart[ln["item_code"]])
+        item.update(description=ln["description"], brand=ln["brand"])
+        if ln["line_total"] is not None:
+            item.update(unit_price=ln["unit_price"], line_total=ln["line_total"])
+        items.append(item)
+
     order = {
         'order_id': f"ORD-{now_local.strftime('%Y%m%d%H%M%S')}",  # local time in ID
         'timestamp': ts_str,
         'customer_name': f"{st.session_state.user_data['first_name']} {st.session_state.user_data['last_name']}",
         'company_name': st.session_state.user_data['company_name'],
         'email': st.session_state.user_data['email'],
-        'items': list(st.session_state.cart.values()),
+        'items': items,
     }
+    if quote["unpriced"] < len(quote["valid"]):
+        order['total'] = round(sum(it.get('line_total', 0) for it in items), 2)
 
     st.session_state.orders_db.append(order)
     save_orders()
+    get_order_index().sync(st.session_state.orders_db)
+    enqueue_order_jobs(order)
 
     st.session_state.cart = {}
     st.session_state.show_order_confirmation = False
@@ -637,6 +1002,31 @@ def submit_order():
     st.balloons()
     st.rerun()
 
+def order_summary_row(o: dict) -> dict:
+    """One-row-per-order summary used by the admin orders table"""
+    items = o.get("items", [])
+    total_qty = sum(int(it.get("quantity", 0)) for it in items)
+
+    # Nice compact preview of items for the table
+    preview = ", ".join(
+        f"{it.get('item_code','')} x{it.get('quantity',0)}"
+        for it in items[:3]
+    )
+    if len(items) > 3:
+        preview += f" … (+{len(items)-3} more)"
+
+    return {
+        "Order ID": o["order_id"],
+        "Timestamp": o["timestamp"],
+        "Customer Name": o["customer_name"],
+        "Company Name": o["company_name"],
+        "Email": o["email"],
+        "Items": len(items),
+        "Total Qty": total_qty,
+        "Total": o.get("total"),
+        "Preview": preview
+    }
+
 def admin_dashboard():
     """Admin dashboard"""
     st.title("Admin Dashboard - Tany Foods Orders")
@@ -645,100 +1035,149 @@ def admin_dashboard():
     
     with tab1:
         st.subheader("All Orders")
+
+        # Post-submit job health (exports, emails, webhooks)
+        queue = get_job_queue()
+        job_counts = queue.counts()
+        if job_counts["failed"]:
+            st.warning(f"⚠️ {job_counts['failed']} post-submit job(s) failed after retries.")
+            if st.button("🔁 Retry failed jobs"):
+                queue.retry_failed()
+                st.rerun()
+        elif job_counts["pending"] or job_counts["running"]:
+            st.caption(f"Post-submit jobs in progress: {job_counts['pending'] + job_counts['running']}")
     
         if not st.session_state.orders_db:
             st.info("No orders received yet.")
         else:
-            orders = st.session_state.orders_db
+            index = get_order_index()
     
-            # ---- Build 1-row-per-order summary ----
-            summary_rows = []
-            for o in orders:
-                items = o.get("items", [])
-                item_count = len(items)
-                total_qty = sum(int(it.get("quantity", 0)) for it in items)
+            # ---- Filters (served from the order index) ----
+            f1, f2 = st.columns(2)
+            with f1:
+                date_range = st.date_input("Date range", value=(), key="orders_date_range")
+                email_opts = ["All"] + sorted(index.emails.values())
+                sel_email = st.selectbox("Customer email", email_opts, key="orders_email")
+            with f2:
+                sku_query = st.text_input("Item code", placeholder="e.g. B-0-01-009", key="orders_sku")
+                company_opts = ["All"] + sorted(index.companies.values())
+                sel_company = st.selectbox("Company", company_opts, key="orders_company")
     
-                # Nice compact preview of items for the table
-                preview = ", ".join(
-                    f"{it.get('item_code','')} x{it.get('quantity',0)}"
-                    for it in items[:3]
-                )
-                if len(items) > 3:
-                    preview += f" … (+{len(items)-3} more)"
+            start_ts = end_ts = None
+            if isinstance(date_range, (list, tuple)) and date_range:
+                start_ts = datetime.combine(date_range[0], dtime.min).strftime('%Y-%m-%d %H:%M:%S')
+                end_day = date_range[1] if len(date_range) > 1 else date_range[0]
+                end_ts = datetime.combine(end_day, dtime.max).strftime('%Y-%m-%d %H:%M:%S')
     
-                summary_rows.append({
-                    "Order ID": o["order_id"],
-                    "Timestamp": o["timestamp"],
-                    "Customer Name": o["customer_name"],
-                    "Company Name": o["company_name"],
-                    "Email": o["email"],
-                    "Items": item_count,
-                    "Total Qty": total_qty,
-                    "Preview": preview
-                })
+            p1, p2 = st.columns(2)
+            with p1:
+                page_size = st.selectbox("Orders per page", [25, 50, 100, 250], index=1, key="orders_page_size")
+            with p2:
+                page = st.number_input("Page", min_value=1, value=1, step=1, key="orders_page")
     
-            df_summary = pd.DataFrame(summary_rows)
-            st.metric("Total Orders", len(df_summary))
-            st.dataframe(df_summary, use_container_width=True)
+            filters = dict(
+                start=start_ts,
+                end=end_ts,
+                email=None if sel_email == "All" else sel_email,
+                company=None if sel_company == "All" else sel_company,
+                item_code=sku_query.strip() or None,
+            )
+            total, orders, page = index.search(page=int(page) - 1, page_size=page_size, **filters)
+            n_pages = max(1, -(-total // page_size))
     
-            st.divider()
+            st.metric("Matching Orders", total)
     
-            # ---- Pick one order to inspect/download ----
-            order_ids = [o["order_id"] for o in orders]
-            selected_id = st.selectbox("Select an order to download", order_ids)
+            if not orders:
+                st.info("No orders match these filters.")
+            else:
+                # ---- Build 1-row-per-order summary for this page ----
+                df_summary = pd.DataFrame([order_summary_row(o) for o in orders])
+                st.caption(f"Page {page + 1} of {n_pages}")
+                st.dataframe(df_summary, use_container_width=True)
     
-            # Find the selected order
-            sel = next(o for o in orders if o["order_id"] == selected_id)
+                st.divider()
     
-            # Show details in an expander (optional)
-            with st.expander("View order details", expanded=False):
-                st.write(f"**Order ID:** {sel['order_id']}")
-                st.write(f"**Customer:** {sel['customer_name']}  |  **Company:** {sel['company_name']}")
-                st.write(f"**Email:** {sel['email']}  |  **Timestamp:** {sel['timestamp']}")
+                # ---- Pick one order to inspect/download ----
+                order_ids = [o["order_id"] for o in orders]
+                selected_id = st.selectbox("Select an order to download", order_ids)
     
-                # Line items table for the selected order
-                df_items = pd.DataFrame([
-                    {
-                        "Item Code": it.get("item_code",""),
-                        "Description": it.get("description",""),
-                        "Brand": it.get("brand",""),
-                        "UOM": it.get("uom",""),
-                        "Quantity": it.get("quantity",0),
-                    }
-                    for it in sel.get("items", [])
-                ])
-                st.dataframe(df_items, use_container_width=True)
+                # Find the selected order
+                sel = next(o for o in orders if o["order_id"] == selected_id)
     
-            # ---- Download buttons for the selected order ----
-            colA, colB = st.columns(2)
-            
-            with colA:
-                excel_sel = df_to_excel_bytes(df_items, sheet_name="OrderItems")
-                st.download_button(
-                    "📥 Download selected order (Excel)",
-                    data=excel_sel,
-                    file_name=f"{selected_id}.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                    use_container_width=True,
-                )
-            
-            with colB:
-                excel_all = df_to_excel_bytes(df_summary, sheet_name="OrdersSummary")
-                st.download_button(
-                    "📥 Download all orders (Excel)",
-                    data=excel_all,
-                    file_name="orders_summary.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                    use_container_width=True,
-                )
+                # Show details in an expander (optional)
+                with st.expander("View order details", expanded=False):
+                    st.write(f"**Order ID:** {sel['order_id']}")
+                    st.write(f"**Customer:** {sel['customer_name']}  |  **Company:** {sel['company_name']}")
+                    st.write(f"**Email:** {sel['email']}  |  **Timestamp:** {sel['timestamp']}")
+    
+                    # Line items table for the selected order
+                    df_items = order_items_df(sel)
+                    st.dataframe(df_items, use_container_width=True)
+    
+                # ---- Download buttons for the selected order ----
+                colA, colB = st.columns(2)
+    
+                with colA:
+                    # Prefer the workbook pre-generated by the post-submit job
+                    export = order_export_path(selected_id)
+                    if export.exists():
+                        excel_sel = export.read_bytes()
+                    else:
+                        excel_sel = df_to_excel_bytes(df_items, sheet_name="OrderItems")
+                    st.download_button(
+                        "📥 Download selected order (Excel)",
+                        data=excel_sel,
+                        file_name=f"{selected_id}.xlsx",
+                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                        use_container_width=True,
+                    )
+    
+                with colB:
+                    # Export every page of the current filter. Built on demand so
+                    # large histories are not re-encoded on every rerun.
+                    export_key = (tuple(sorted(filters.items())), total)
+                    prepared = st.session_state.get("orders_export")
+                    if prepared and prepared[0] == export_key:
+                        st.download_button(
+                            "📥 Download all matching orders (Excel)",
+                            data=prepared[1],
+                            file_name="orders_summary.xlsx",
+                            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                            use_container_width=True,
+                        )
+                    elif st.button(f"📦 Prepare Excel of all {total} matching orders", use_container_width=True):
+                        _, matching, _ = index.search(page_size=total, **filters)
+                        df_all = pd.DataFrame([order_summary_row(o) for o in matching])
+                        st.session_state.orders_export = (
+                            export_key, df_to_excel_bytes(df_all, sheet_name="OrdersSummary"))
+                        st.rerun()
     
     with tab2:
         st.subheader("Product Database Management")
+
+        # Scheduled sync status (only when CATALOG_SOURCE is configured)
+        sync = get_catalog_sync()
+        if sync:
+            st.write(f"**Catalog sync:** `{sync.source}` every {sync.interval}s")
+            fmt = lambda d: d.strftime('%Y-%m-%d %H:%M:%S') if d else "never"
+            st.caption(f"Last checked: {fmt(sync.last_checked)}  |  Last change applied: {fmt(sync.last_synced)}")
+            if sync.last_error:
+                st.error(f"Last sync failed: {sync.last_error}")
+            if st.button("🔄 Sync now"):
+                if sync.check():
+                    st.success("✅ New catalog version loaded.")
+                    st.rerun()
+                elif sync.last_error:
+                    st.error(f"Sync failed: {sync.last_error}")
+                else:
+                    st.info("Catalog source is unchanged.")
+            st.divider()
         
         # Upload product database
         st.write("**Upload Product Database (CSV/Excel)**")
         uploaded_file = st.file_uploader(
-            "Upload file with columns: item_code, description, brand, category, allow_case, allow_each",
+            "Upload file with columns: item_code, description, brand, category, allow_case, allow_each "
+            "(optional: case_price, each_price, pack_size)",
             type=['csv', 'xlsx']
         )
         
@@ -749,21 +1188,18 @@ def admin_dashboard():
                 else:
                     df = pd.read_excel(uploaded_file)
                 
+                validate_products_df(df)
+                
                 # Convert DataFrame to product list
-                products = []
-                for _, row in df.iterrows():
-                    products.append({
-                        'item_code': row.get('item_code', ''),
-                        'description': row.get('description', ''),
-                        'category': row.get('category', 'Uncategorized'),
-                        'brand': row.get('brand', ''),
-                        'allow_case': row.get('allow_case', True),
-                        'allow_each': row.get('allow_each', True),
-                        'image_path': row.get('image_path', '')
-                    })
+                products = products_from_df(df)
                 
-                st.session_state.products_db = products
-                save_products()
+                # The uploader keeps its file across reruns; only publish a new
+                # catalog version when the file content changes
+                upload_id = hashlib.sha256(uploaded_file.getvalue()).hexdigest()
+                if st.session_state.get("last_upload_id") != upload_id:
+                    st.session_state.products_db = products
+                    save_products()
+                    st.session_state.last_upload_id = upload_id
                 st.success(f"✅ Uploaded {len(products)} products successfully!")
                 st.dataframe(df, use_container_width=True)
                 
@@ -773,7 +1209,7 @@ def admin_dashboard():
         # Display current products
         if st.session_state.products_db:
             st.write(f"**Current Products: {len(st.session_state.products_db)}**")
-            df_products = pd.DataFrame(st.session_state.products_db)
+            df_products = pd.DataFrame(list(st.session_state.products_db))
             st.dataframe(df_products, use_container_width=True)
 
 # Main app logic
@@ -804,6 +1240,8 @@ def main():
                 cart_page()
             elif st.session_state.current_page == 'product_detail':  # NEW
                 product_detail_page()
+            elif st.session_state.current_page == 'history':
+                order_history_page()
 
 if __name__ == "__main__":
     main()
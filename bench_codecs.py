@@ -0,0 +1,69 @@
+"""Compare storage codecs on a generated order history.
+
+Usage: python bench_codecs.py [number_of_orders]
+"""
+import json
+import random
+import sys
+import time
+
+from storage import available_codecs, available_compressions, decode_data, encode_data
+
+def make_orders(n: int) -> list:
+    rng = random.Random(42)
+    skus = [f"{c}-{rng.randint(0, 9)}-{rng.randint(1, 20):02d}-{rng.randint(1, 999):03d}" for c in "BQSC" * 50]
+    orders = []
+    for i in range(n):
+        user = rng.randint(1, 300)
+        orders.append({
+            "order_id": f"ORD-2026{i:010d}",
+            "timestamp": f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} {rng.randint(0, 23):02d}:00:00",
+            "customer_name": f"Cliente Número {user}",
+            "company_name": f"Compañía {user % 40}",
+            "email": f"user{user}@example.com",
+            "items": [
+                {
+                    "item_code": sku,
+                    "description": f"Producto {sku} 12/10 oz",
+                    "brand": "Paisa",
+                    "uom": rng.choice(["Case", "Each"]),
+                    "quantity": rng.randint(1, 20),
+                }
+                for sku in rng.sample(skus, rng.randint(1, 12))
+            ],
+        })
+    return orders
+
+def timed(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    orders = make_orders(n)
+
+    # Baseline: what save_json() used to write
+    legacy = json.dumps(orders, ensure_ascii=False, indent=2).encode("utf-8")
+    rows = [("legacy json indent=2", "none", len(legacy),
+             timed(lambda: json.loads(legacy.decode("utf-8"))),
+             timed(lambda: json.dumps(orders, ensure_ascii=False, indent=2).encode("utf-8")))]
+
+    for codec in available_codecs():
+        for compress in available_compressions():
+            data = encode_data(orders, codec, compress)
+            assert decode_data(data) == orders
+            rows.append((codec, compress, len(data),
+                         timed(lambda: decode_data(data)),
+                         timed(lambda: encode_data(orders, codec, compress))))
+
+    print(f"{n} orders")
+    print(f"{'codec':<22}{'compress':<10}{'size KB':>10}{'load ms':>10}{'save ms':>10}")
+    for codec, compress, size, load_s, save_s in rows:
+        print(f"{codec:<22}{compress:<10}{size / 1024:>10.0f}{load_s * 1000:>10.1f}{save_s * 1000:>10.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Cart validation and pricing against the current catalog.
+
+Kept free of Streamlit so it can be tested on its own; app.price_cart adds
+the per-session quote cache.
+"""
+
+def uom_allowed(product: dict, uom: str) -> bool:
+    if uom == "Case":
+        return bool(product.get('allow_case', True))
+    if uom == "Each":
+        return bool(product.get('allow_each', True))
+    return False
+
+def unit_price(product: dict, uom: str):
+    """Price for one unit of `uom`, derived from the other UOM and pack_size if needed"""
+    case_price, each_price = product.get('case_price'), product.get('each_price')
+    pack_size = product.get('pack_size')
+    if uom == "Case":
+        if case_price is not None:
+            return case_price
+        if each_price is not None and pack_size:
+            return each_price * pack_size
+    elif uom == "Each":
+        if each_price is not None:
+            return each_price
+        if case_price is not None and pack_size:
+            return case_price / pack_size
+    return None
+
+def price_line(product, item_code: str, uom: str, qty: int) -> dict:
+    """Validate and price one cart line (product is None if it left the catalog)"""
+    line = {"item_code": item_code, "uom": uom, "quantity": qty,
+            "unit_price": None, "line_total": None}
+    if product is None:
+        line["status"] = "removed"
+        return line
+    line["description"] = product.get("description", "")
+    line["brand"] = (product.get("brand") or "").strip()
+    if not uom_allowed(product, uom):
+        line["status"] = "invalid_uom"
+        return line
+    line["status"] = "ok"
+    price = unit_price(product, uom)
+    if price is not None:
+        line["unit_price"] = round(price, 2)
+        line["line_total"] = round(price * qty, 2)
+    return line
+
+def cart_keys(cart: dict) -> tuple:
+    """(item_code, uom, quantity) for every cart line, in cart order"""
+    return tuple((code, it.get("uom", ""), int(it.get("quantity", 1))) for code, it in cart.items())
+
+def quote_cart(keys: tuple, version: int, by_code, line_cache: dict) -> dict:
+    """Price cart lines against one catalog version and total them by UOM.
+
+    Lines are looked up in the catalog's item_code map and memoized in
+    line_cache per (item_code, uom, quantity) for that version, so editing
+    one quantity only reprices that line.
+    """
+    lines = []
+    for key in keys:
+        line = line_cache.get(key)
+        if line is None:
+            line = line_cache[key] = price_line(by_code.get(key[0]), *key)
+        lines.append(line)
+
+    valid = [ln for ln in lines if ln["status"] == "ok"]
+    totals = {"Case": 0.0, "Each": 0.0}
+    for ln in valid:
+        if ln["line_total"] is not None:
+            totals[ln["uom"]] += ln["line_total"]
+    return {
+        "version": version,
+        "lines": lines,
+        "valid": valid,
+        "invalid": [ln for ln in lines if ln["status"] != "ok"],
+        "case_total": round(totals["Case"], 2),
+        "each_total": round(totals["Each"], 2),
+        "total": round(totals["Case"] + totals["Each"], 2),
+        "unpriced": sum(1 for ln in valid if ln["line_total"] is None),
+    }
+
+def fmt_money(value) -> str:
+    return "—" if value is None else f"${value:,.2f}"
@@ -0,0 +1,312 @@
+"""Compiled, read-only binary catalog shared between worker processes.
+
+The admin upload / catalog sync writes products.json and, next to it, a
+fixed-layout columnar file (products.bin) that every Streamlit process can
+`mmap` instead of parsing JSON. Pages of the file are shared by the OS, so
+host memory is paid once.
+
+Layout (little-endian):
+    b"TFCATBIN" | u32 header length | JSON header | sections (8-byte aligned)
+
+The header lists each section as [offset, length]. Sections:
+    s:<col>.off / s:<col>.dat   string column: u32 offsets (rows + 1) + UTF-8 blob
+    n:<col>                     float64 column, NaN = missing
+    b:<col>                     uint8 column (0/1)
+    search.off / search.dat     lowercase "item_code\\0description" per row
+    hash                        u32 open-addressing table of row + 1 (0 = empty)
+    post.key.off / .dat         sorted category names (string table)
+    post.off / post.rows        u32 posting offsets + u32 row ids per category
+"""
+import bisect
+import json
+import mmap
+import os
+import struct
+import tempfile
+import zlib
+from array import array
+from collections.abc import Mapping, Sequence
+from pathlib import Path
+
+MAGIC = b"TFCATBIN"
+FORMAT_VERSION = 1
+
+STRING_COLUMNS = ("item_code", "description", "category", "brand", "image_path")
+NUMBER_COLUMNS = ("case_price", "each_price", "pack_size")
+BOOL_COLUMNS = ("allow_case", "allow_each")
+
+def _text(value) -> str:
+    if value is None or (isinstance(value, float) and value != value):
+        return ""
+    return str(value)
+
+def _number(value) -> float:
+    try:
+        return float(value) if value is not None else float("nan")
+    except (TypeError, ValueError):
+        return float("nan")
+
+def _string_table(values):
+    offsets = array("I", [0])
+    blob = bytearray()
+    for v in values:
+        blob += v.encode("utf-8")
+        offsets.append(len(blob))
+    return offsets.tobytes(), bytes(blob)
+
+def _category(product) -> str:
+    """Category as stored in both the column and the postings"""
+    return _text(product.get("category")) or "Uncategorized"
+
+def _slot(code: str, size: int) -> int:
+    return zlib.crc32(code.encode("utf-8")) & (size - 1)
+
+def compile_catalog(products, path, source_stamp=None):
+    """Write products to a compiled catalog file (atomically replaced)."""
+    n = len(products)
+    sections = {}
+
+    for col in STRING_COLUMNS:
+        text = _category if col == "category" else (lambda p, col=col: _text(p.get(col)))
+        sections[f"s:{col}.off"], sections[f"s:{col}.dat"] = _string_table(text(p) for p in products)
+    for col in NUMBER_COLUMNS:
+        sections[f"n:{col}"] = array("d", (_number(p.get(col)) for p in products)).tobytes()
+    for col in BOOL_COLUMNS:
+        sections[f"b:{col}"] = bytes(bool(p.get(col, True)) for p in products)
+
+    sections["search.off"], sections["search.dat"] = _string_table(
+        f"{_text(p.get('item_code'))}\0{_text(p.get('description'))}".lower() for p in products
+    )
+
+    size = 1
+    while size < 2 * n:
+        size <<= 1
+    table = array("I", bytes(4 * size))
+    for row, p in enumerate(products):
+        i = _slot(_text(p.get("item_code")), size)
+        while table[i]:
+            i = (i + 1) & (size - 1)
+        table[i] = row + 1
+    sections["hash"] = table.tobytes()
+
+    postings = {}
+    for row, p in enumerate(products):
+        postings.setdefault(_category(p), []).append(row)
+    keys = sorted(postings)
+    sections["post.key.off"], sections["post.key.dat"] = _string_table(keys)
+    post_off, post_rows = array("I", [0]), array("I")
+    for k in keys:
+        post_rows.extend(postings[k])
+        post_off.append(len(post_rows))
+    sections["post.off"], sections["post.rows"] = post_off.tobytes(), post_rows.tobytes()
+
+    # Lay out sections after the header, each 8-byte aligned
+    layout, offset = {}, 0
+    for name, data in sections.items():
+        layout[name] = [offset, len(data)]
+        offset += (len(data) + 7) & ~7
+    header = json.dumps({
+        "format": FORMAT_VERSION,
+        "rows": n,
+        "source_stamp": list(source_stamp) if source_stamp else None,
+        "sections": layout,
+    }).encode("utf-8")
+    base = (len(MAGIC) + 4 + len(header) + 7) & ~7
+
+    # Several processes may compile at once: each writes its own temp file in
+    # the target directory and atomically replaces the previous version.
+    path = Path(path)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(MAGIC + struct.pack("<I", len(header)) + header)
+            f.write(bytes(base - f.tell()))
+            for name, data in sections.items():
+                f.write(data)
+                f.write(bytes(((len(data) + 7) & ~7) - len(data)))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+class _ItemCodeIndex(Mapping):
+    """Read-only item_code -> product mapping backed by the file's hash table."""
+
+    def __init__(self, catalog):
+        self._catalog = catalog
+
+    def __getitem__(self, code):
+        row = self._catalog.find(code)
+        if row is None:
+            raise KeyError(code)
+        return self._catalog[row]
+
+    def __iter__(self):
+        return (self._catalog.text("item_code", i) for i in range(len(self._catalog)))
+
+    def __len__(self):
+        return len(self._catalog)
+
+class MappedCatalog(Sequence):
+    """Product list served straight from a memory-mapped compiled catalog.
+
+    Behaves like the list of product dicts loaded from products.json; rows
+    are decoded on access and never copied into the process otherwise.
+    """
+
+    def __init__(self, path):
+        """Map and validate a compiled catalog; raises ValueError if it is not usable."""
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a compiled catalog")
+        try:
+            (hlen,) = struct.unpack_from("<I", self._mm, len(MAGIC))
+            start = len(MAGIC) + 4
+            self.header = json.loads(self._mm[start:start + hlen])
+            if self.header["format"] != FORMAT_VERSION:
+                raise ValueError(f"unsupported catalog format {self.header['format']}")
+            self._base = (start + hlen + 7) & ~7
+            self._view = memoryview(self._mm)
+            self._rows = self.header["rows"]
+            self._check_layout()
+            self._u32 = {name: self._section(name).cast("I") for name in self.header["sections"]
+                         if name.endswith(".off") or name in ("hash", "post.rows")}
+            self._f64 = {col: self._section(f"n:{col}").cast("d") for col in NUMBER_COLUMNS}
+            self._check_offsets()
+        except ValueError:
+            raise
+        except Exception as e:  # struct.error, KeyError, TypeError, UnicodeDecodeError, ...
+            raise ValueError(f"{path} is not a valid compiled catalog: {type(e).__name__}: {e}") from e
+        self.by_code = _ItemCodeIndex(self)
+
+    def _check_layout(self):
+        """Every section must be present, correctly sized and inside the file."""
+        rows, sections = self._rows, self.header["sections"]
+        if not isinstance(rows, int) or rows < 0:
+            raise ValueError(f"bad row count {rows!r}")
+        expected = {}
+        for table in [f"s:{c}" for c in STRING_COLUMNS] + ["search"]:
+            expected[f"{table}.off"] = 4 * (rows + 1)
+            expected[f"{table}.dat"] = None
+        expected.update({f"n:{c}": 8 * rows for c in NUMBER_COLUMNS})
+        expected.update({f"b:{c}": rows for c in BOOL_COLUMNS})
+        expected.update(dict.fromkeys(("hash", "post.key.off", "post.key.dat", "post.off", "post.rows")))
+        for name, size in expected.items():
+            offset, length = sections[name]
+            if size is not None and length != size:
+                raise ValueError(f"section {name} has {length} bytes, expected {size}")
+            if offset < 0 or length < 0 or self._base + offset + length > len(self._mm):
+                raise ValueError(f"section {name} runs past the end of the file (truncated?)")
+        hash_len = sections["hash"][1] // 4
+        if hash_len & (hash_len - 1) or hash_len < rows or sections["hash"][1] % 4:
+            raise ValueError("bad hash table size")
+        for name in ("post.key.off", "post.off", "post.rows"):
+            if sections[name][1] % 4:
+                raise ValueError(f"section {name} is not a u32 array")
+
+    def _check_offsets(self):
+        """Offset arrays must end inside the data they index."""
+        sections = self.header["sections"]
+        for table in [f"s:{c}" for c in STRING_COLUMNS] + ["search", "post.key"]:
+            off = self._u32[f"{table}.off"]
+            if len(off) and off[-1] > sections[f"{table}.dat"][1]:
+                raise ValueError(f"offsets of {table} point past its data")
+        if len(self._u32["post.off"]) != len(self._u32["post.key.off"]):
+            raise ValueError("posting offsets do not match category keys")
+        post_off = self._u32["post.off"]
+        if len(post_off) and post_off[-1] != len(self._u32["post.rows"]):
+            raise ValueError("posting offsets do not match posting rows")
+        if any(r >= self._rows for r in self._u32["post.rows"]):
+            raise ValueError("posting row out of range")
+
+    @property
+    def source_stamp(self):
+        stamp = self.header.get("source_stamp")
+        return tuple(stamp) if stamp else None
+
+    def _section(self, name) -> memoryview:
+        offset, length = self.header["sections"][name]
+        return self._view[self._base + offset:self._base + offset + length]
+
+    def _string(self, table: str, i: int) -> str:
+        off = self._u32[f"{table}.off"]
+        offset, _ = self.header["sections"][f"{table}.dat"]
+        start = self._base + offset
+        return self._mm[start + off[i]:start + off[i + 1]].decode("utf-8")
+
+    def text(self, col: str, i: int) -> str:
+        return self._string(f"s:{col}", i)
+
+    def __len__(self):
+        return self._rows
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._rows))]
+        if i < 0:
+            i += self._rows
+        if not 0 <= i < self._rows:
+            raise IndexError(i)
+        product = {col: self.text(col, i) for col in STRING_COLUMNS}
+        for col in BOOL_COLUMNS:
+            product[col] = bool(self._section(f"b:{col}")[i])
+        for col in NUMBER_COLUMNS:
+            v = self._f64[col][i]
+            product[col] = None if v != v else v
+        return product
+
+    def find(self, code):
+        """Row of an item_code via the prebuilt hash index, or None."""
+        table = self._u32["hash"]
+        size = len(table)
+        if not size:
+            return None
+        code = _text(code)
+        i = _slot(code, size)
+        while table[i]:
+            row = table[i] - 1
+            if self.text("item_code", row) == code:
+                return row
+            i = (i + 1) & (size - 1)
+        return None
+
+    def categories(self) -> list:
+        off = self._u32["post.key.off"]
+        return [self._string("post.key", k) for k in range(len(off) - 1)]
+
+    def category_rows(self, category) -> memoryview:
+        """Row ids in a category (a zero-copy slice of the postings section)."""
+        keys = self.categories()
+        k = bisect.bisect_left(keys, category)
+        if k == len(keys) or keys[k] != category:
+            return memoryview(b"").cast("I")
+        off = self._u32["post.off"]
+        return self._u32["post.rows"][off[k]:off[k + 1]]
+
+    def search_rows(self, query: str) -> list:
+        """Rows whose item code or description contains query (case-insensitive).
+
+        Scans the mapped search section with mmap.find, without decoding rows.
+        """
+        needle = query.lower().encode("utf-8")
+        if not needle:
+            return list(range(self._rows))
+        offset, length = self.header["sections"]["search.dat"]
+        start, end = self._base + offset, self._base + offset + length
+        off = self._u32["search.off"]
+        rows, pos = [], self._mm.find(needle, start, end)
+        while pos != -1:
+            row = bisect.bisect_right(off, pos - start) - 1
+            if pos + len(needle) <= start + off[row + 1]:
+                rows.append(row)
+                # continue from the next row; one hit per row is enough
+                pos = self._mm.find(needle, start + off[row + 1], end)
+            else:
+                pos = self._mm.find(needle, pos + 1, end)  # hit spans two rows
+        return rows
@@ -0,0 +1,158 @@
+"""Background job that polls a catalog CSV source and applies changed versions.
+
+The source is a local path or an http(s) URL (e.g. a published Google Sheet
+CSV export). Unchanged sources are detected before parsing: by mtime/size and
+content hash for files, and by ETag / Last-Modified (304 responses) for URLs.
+Change markers are only committed once a version has been applied, so a
+source that fails validation keeps its error and is retried on every poll.
+With a state_path they are also saved to disk and re-read before each poll,
+so a restart, or another process that already applied the version, does not
+re-apply an unchanged source.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import urllib.error
+import urllib.request
+from datetime import datetime
+from pathlib import Path
+
+class CatalogSync:
+    """Poll `source` every `interval` seconds and pass new content to `apply`.
+
+    `apply(data: bytes)` parses, validates and swaps in the catalog; any
+    exception it raises leaves the current catalog in place. `state_path`
+    (optional) is a JSON file holding the markers of the last applied version.
+    """
+
+    MARKERS = ("etag", "last_modified", "file_stamp", "digest")
+
+    def __init__(self, source: str, apply, interval: int = 300, tz=None, state_path=None):
+        self.source = source
+        self.apply = apply
+        self.interval = interval
+        self.tz = tz
+        self.state_path = Path(state_path) if state_path else None
+        # Markers of the last applied version
+        self.etag = None
+        self.last_modified = None
+        self.file_stamp = None
+        self.digest = None
+        self.last_checked = None
+        self.last_synced = None
+        self.last_error = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _is_url(self) -> bool:
+        return self.source.startswith(("http://", "https://"))
+
+    def _fetch(self):
+        """Return (data, markers); data is None if the source is unchanged."""
+        if self._is_url():
+            req = urllib.request.Request(self.source)
+            if self.etag:
+                req.add_header("If-None-Match", self.etag)
+            if self.last_modified:
+                req.add_header("If-Modified-Since", self.last_modified)
+            try:
+                with urllib.request.urlopen(req, timeout=30) as resp:
+                    data = resp.read()
+                    markers = {"etag": resp.headers.get("ETag"),
+                               "last_modified": resp.headers.get("Last-Modified")}
+            except urllib.error.HTTPError as e:
+                if e.code == 304:
+                    return None, {}
+                raise
+        else:
+            p = Path(self.source)
+            st_ = p.stat()
+            stamp = (st_.st_mtime_ns, st_.st_size)
+            if stamp == self.file_stamp:
+                return None, {}
+            data = p.read_bytes()
+            markers = {"file_stamp": stamp}
+
+        markers["digest"] = hashlib.sha256(data).hexdigest()
+        if markers["digest"] == self.digest:
+            self._commit(markers)  # touched/re-served but same content
+            return None, {}
+        return data, markers
+
+    def _load_state(self):
+        """Adopt the markers last saved for this source (by any process)."""
+        if self.state_path is None:
+            return
+        try:
+            state = json.loads(self.state_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return  # no state yet, or unreadable: fall back to the in-memory markers
+        if not isinstance(state, dict) or state.get("source") != self.source:
+            return
+        for name in self.MARKERS:
+            setattr(self, name, state.get(name))
+        if self.file_stamp is not None:
+            self.file_stamp = tuple(self.file_stamp)
+        if state.get("synced_at") and self.last_synced is None:
+            self.last_synced = datetime.fromisoformat(state["synced_at"])
+
+    def _save_state(self):
+        state = {name: getattr(self, name) for name in self.MARKERS}
+        state["source"] = self.source
+        state["synced_at"] = self.last_synced.isoformat() if self.last_synced else None
+        fd, tmp = tempfile.mkstemp(dir=self.state_path.parent, prefix=self.state_path.name + ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(state, f)
+            os.replace(tmp, self.state_path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+
+    def _commit(self, markers: dict):
+        for name, value in markers.items():
+            setattr(self, name, value)
+        if self.state_path is not None:
+            self._save_state()
+
+    def check(self) -> bool:
+        """Poll the source once; returns True if a new catalog was applied."""
+        with self._lock:
+            self.last_checked = datetime.now(self.tz)
+            try:
+                self._load_state()
+                data, markers = self._fetch()
+                if data is None:
+                    self.last_error = None
+                    return False
+                self.apply(data)
+            except Exception as e:
+                # Keep serving the current catalog and retry on the next poll
+                self.last_error = str(e)
+                return False
+            self.last_error = None
+            self.last_synced = self.last_checked
+            try:
+                self._commit(markers)
+            except OSError as e:
+                self.last_error = f"applied, but could not save sync state: {e}"
+            return True
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.check()
+            self._stop.wait(self.interval)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="catalog-sync", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
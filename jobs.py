@@ -0,0 +1,223 @@
+"""Persistent post-submit job queue and the built-in order notification handlers.
+
+Jobs are JSON files on disk, claimed by worker threads via atomic rename and
+retried with exponential backoff. Handlers are registered per job kind with
+@job_handler; app.py adds the warehouse Excel export.
+"""
+import json
+import logging
+import os
+import smtplib
+import threading
+import time
+import urllib.request
+import uuid
+from email.message import EmailMessage
+from pathlib import Path
+
+log = logging.getLogger(__name__)
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "5"))
+JOB_BACKOFF_SECONDS = float(os.getenv("JOB_BACKOFF_SECONDS", "10"))
+
+SMTP_HOST = os.getenv("SMTP_HOST", "")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "25"))
+SMTP_FROM = os.getenv("SMTP_FROM", "orders@tanyfoods.com")
+ORDER_NOTIFY_EMAIL = os.getenv("ORDER_NOTIFY_EMAIL", "")
+ORDER_WEBHOOK_URL = os.getenv("ORDER_WEBHOOK_URL", "")
+
+JOB_HANDLERS = {}
+
+def _is_job(job) -> bool:
+    return isinstance(job, dict) and {"kind", "payload", "attempts"} <= job.keys()
+
+def _job_name(name: str) -> str:
+    """File name without its pending/<due_ns>- prefix"""
+    return name[21:] if name[:20].isdigit() and name[20:21] == "-" else name
+
+def job_handler(kind: str):
+    """Register fn(payload) as the handler for jobs of this kind"""
+    def register(fn):
+        JOB_HANDLERS[kind] = fn
+        return fn
+    return register
+
+class JobQueue:
+    """Persistent job queue: one JSON file per job, claimed by atomic rename.
+
+    pending/<due_ns>-<id>.json  waiting (sorted by due time)
+    running/<...>.json          claimed by a worker
+    failed/<...>.json           gave up after max_attempts
+    Finished jobs are deleted. Failures are retried with exponential backoff.
+    """
+
+    def __init__(self, root: Path, workers: int = JOB_WORKERS, max_attempts: int = JOB_MAX_ATTEMPTS,
+                 backoff: float = JOB_BACKOFF_SECONDS, handlers: dict = None):
+        self.root = Path(root)
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.handlers = JOB_HANDLERS if handlers is None else handlers
+        self.pending, self.running, self.failed = (self.root / d for d in ("pending", "running", "failed"))
+        for d in (self.pending, self.running, self.failed):
+            d.mkdir(parents=True, exist_ok=True)
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def _write(self, path: Path, job: dict):
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(job, ensure_ascii=False, default=str), encoding="utf-8")
+        tmp.replace(path)
+
+    def enqueue(self, kind: str, payload: dict) -> str:
+        job_id = f"{kind}-{uuid.uuid4().hex[:12]}"
+        job = {"id": job_id, "kind": kind, "payload": payload, "attempts": 0, "error": None}
+        self._write(self.pending / f"{time.time_ns():020d}-{job_id}.json", job)
+        self._wake.set()
+        return job_id
+
+    def _quarantine(self, path: Path, reason: str):
+        """Move a job file that cannot be run to failed/ so the admin sees it."""
+        log.error("Moving malformed job %s to failed/: %s", path.name, reason)
+        try:
+            os.rename(path, self.failed / path.name)
+        except OSError:
+            log.exception("Could not move %s to failed/", path.name)
+
+    def _claim(self):
+        """Move the oldest due job to running/.
+
+        Returns (path, None), or (None, seconds until the next job is due).
+        """
+        now = time.time_ns()
+        for name in sorted(os.listdir(self.pending)):
+            if not name.endswith(".json"):
+                continue
+            if not (name[:20].isdigit() and name[20:21] == "-"):
+                self._quarantine(self.pending / name, "unexpected file name")
+                continue
+            due = int(name[:20])
+            if due > now:
+                return None, (due - now) / 1e9  # the rest are scheduled later
+            dst = self.running / name
+            try:
+                os.rename(self.pending / name, dst)
+                os.utime(dst)  # claim time, used by recover()
+            except OSError:
+                continue  # another worker/process took it
+            return dst, None
+        return None, None
+
+    def run_once(self) -> bool:
+        """Run one due job if there is one; returns False when nothing was due."""
+        path, _ = self._claim()
+        return self._run_job(path) if path else False
+
+    def _run_job(self, path: Path) -> bool:
+        try:
+            job = json.loads(path.read_text(encoding="utf-8"))
+            if not _is_job(job):
+                raise ValueError("missing job fields")
+        except (OSError, ValueError) as e:
+            self._quarantine(path, f"{type(e).__name__}: {e}")
+            return True
+        try:
+            handler = self.handlers[job["kind"]]
+            handler(job["payload"])
+        except Exception as e:
+            job["attempts"] += 1
+            job["error"] = f"{type(e).__name__}: {e}"
+            job_name = _job_name(path.name)
+            if job["attempts"] >= self.max_attempts:
+                self._write(self.failed / job_name, job)
+            else:
+                delay = self.backoff * 2 ** (job["attempts"] - 1)
+                due = time.time_ns() + int(delay * 1e9)
+                self._write(self.pending / f"{due:020d}-{job_name}", job)
+        path.unlink(missing_ok=True)
+        return True
+
+    def recover(self, older_than: float = 600):
+        """Requeue jobs left in running/ by a worker that died mid-job."""
+        cutoff = time.time() - older_than
+        for p in self.running.glob("*.json"):
+            try:
+                if p.stat().st_mtime < cutoff:
+                    os.rename(p, self.pending / p.name)
+            except OSError:
+                pass
+
+    def retry_failed(self) -> int:
+        """Requeue failed jobs; malformed files stay in failed/ for inspection."""
+        n = 0
+        for p in self.failed.glob("*.json"):
+            try:
+                job = json.loads(p.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                continue
+            if not _is_job(job):
+                continue
+            job["attempts"] = 0
+            self._write(self.pending / f"{time.time_ns():020d}-{_job_name(p.name)}", job)
+            p.unlink()
+            n += 1
+        self._wake.set()
+        return n
+
+    def counts(self) -> dict:
+        return {d.name: sum(1 for _ in d.glob("*.json")) for d in (self.pending, self.running, self.failed)}
+
+    def _worker(self):
+        while not self._stop.is_set():
+            try:
+                path, wait = self._claim()
+                if path:
+                    self._run_job(path)
+                    continue
+            except Exception:
+                # Never let one bad iteration shrink the pool
+                log.exception("Order job worker error")
+                wait = 1.0
+            # Sleep until the next retry is due or a new job is enqueued
+            self._wake.wait(min(wait or 1.0, 1.0))
+            self._wake.clear()
+
+    def start(self):
+        self.recover()
+        for i in range(self.workers - len(self._threads)):
+            t = threading.Thread(target=self._worker, name=f"order-jobs-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+@job_handler("order_email")
+def _job_order_email(payload: dict):
+    order = payload["order"]
+    msg = EmailMessage()
+    msg["Subject"] = f"Tany Foods order {order['order_id']}"
+    msg["From"] = SMTP_FROM
+    msg["To"] = ", ".join(a for a in (order.get("email"), ORDER_NOTIFY_EMAIL) if a)
+    lines = [f"{it.get('item_code','')}  {it.get('description','')}  {it.get('quantity',0)} x {it.get('uom','')}"
+             for it in order.get("items", [])]
+    msg.set_content(
+        f"Order {order['order_id']} from {order['customer_name']} ({order['company_name']})\n"
+        f"Placed: {order['timestamp']}\n\n" + "\n".join(lines)
+    )
+    with smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=30) as smtp:
+        smtp.send_message(msg)
+
+@job_handler("order_webhook")
+def _job_order_webhook(payload: dict):
+    req = urllib.request.Request(
+        ORDER_WEBHOOK_URL,
+        data=json.dumps(payload["order"], ensure_ascii=False, default=str).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    with urllib.request.urlopen(req, timeout=30) as resp:
+        resp.read()
@@ -0,0 +1,194 @@
+"""Secondary indexes over the order list for admin search and customer history.
+
+OrderIndex is kept per process (see get_order_index in app.py) and caught up
+incrementally as orders are appended to orders.json.
+"""
+import bisect
+import threading
+from collections import Counter
+
+def _norm_key(value) -> str:
+    return str(value or "").strip().lower()
+
+def _norm_sku(value) -> str:
+    return str(value or "").strip().upper()
+
+class Postings:
+    """Order positions sorted by (timestamp, position), with the timestamps alongside.
+
+    Orders normally arrive in time order, so adding one is an append; only an
+    out-of-order timestamp pays for an insort.
+    """
+
+    __slots__ = ("ts", "pos")
+
+    def __init__(self):
+        self.ts = []
+        self.pos = []
+
+    def __len__(self):
+        return len(self.pos)
+
+    def add(self, ts: str, pos: int):
+        if not self.ts or ts >= self.ts[-1]:
+            self.ts.append(ts)
+            self.pos.append(pos)
+        else:
+            # pos is the largest so far, so it goes after equal timestamps
+            i = bisect.bisect_right(self.ts, ts)
+            self.ts.insert(i, ts)
+            self.pos.insert(i, pos)
+
+    def window(self, start=None, end=None):
+        """(lo, hi) slice of entries with start <= timestamp <= end"""
+        lo = bisect.bisect_left(self.ts, start) if start else 0
+        hi = bisect.bisect_right(self.ts, end) if end else len(self.ts)
+        return lo, max(lo, hi)
+
+    def contains(self, ts: str, pos: int) -> bool:
+        lo = bisect.bisect_left(self.ts, ts)
+        hi = bisect.bisect_right(self.ts, ts, lo)
+        i = bisect.bisect_left(self.pos, pos, lo, hi)
+        return i < hi and self.pos[i] == pos
+
+_EMPTY = Postings()
+
+class OrderIndex:
+    """Secondary indexes over orders_db (timestamp, email, company, SKU).
+
+    Positions refer to the order list the index was synced with. Orders are
+    only ever appended, so the index is kept up to date incrementally. Every
+    posting list is kept in time order, so a search bisects the date window
+    and reads only the requested page.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset([])
+
+    def _reset(self, orders):
+        self.orders = []
+        self.by_time = Postings()  # all orders
+        self.by_email = {}     # email -> Postings
+        self.by_company = {}   # company -> Postings
+        self.by_sku = {}       # item_code -> Postings
+        self.emails = {}       # normalized -> display value
+        self.companies = {}
+        self._favorites = {}   # email -> (orders counted, {item_code: usage stats})
+        self._matches = None   # (query, positions) of the last multi-filter search
+        for o in orders:
+            self._add(o)
+
+    def _add(self, order):
+        pos = len(self.orders)
+        self.orders.append(order)
+        self._matches = None
+        ts = order.get("timestamp") or ""
+        self.by_time.add(ts, pos)
+
+        email = _norm_key(order.get("email"))
+        self.by_email.setdefault(email, Postings()).add(ts, pos)
+        self.emails.setdefault(email, order.get("email", ""))
+
+        company = _norm_key(order.get("company_name"))
+        self.by_company.setdefault(company, Postings()).add(ts, pos)
+        self.companies.setdefault(company, order.get("company_name", ""))
+
+        for sku in {_norm_sku(it.get("item_code")) for it in order.get("items", [])}:
+            self.by_sku.setdefault(sku, Postings()).add(ts, pos)
+
+    def sync(self, orders):
+        """Catch up with the persisted order list; rebuild only if it was rewritten."""
+        with self._lock:
+            n = len(self.orders)
+            if len(orders) < n or (n and orders[n - 1].get("order_id") != self.orders[n - 1].get("order_id")):
+                self._reset(orders)
+            else:
+                for o in orders[n:]:
+                    self._add(o)
+
+    def _item_stats(self, positions) -> dict:
+        favs = {}
+        for pos in positions:
+            for it in self.orders[pos].get("items", []):
+                code = it.get("item_code", "")
+                stats = favs.setdefault(code, {"count": 0, "uoms": Counter(), "qtys": Counter()})
+                stats["count"] += 1
+                stats["uoms"][it.get("uom", "")] += 1
+                stats["qtys"][int(it.get("quantity", 1))] += 1
+                stats["description"] = it.get("description") or stats.get("description", "")
+                stats["brand"] = it.get("brand") or stats.get("brand", "")
+        return favs
+
+    def top_items(self, email, n: int = 10):
+        """Most frequently ordered items for a customer, with their usual UOM and quantity.
+
+        Usage stats are built from the customer's own orders on first use and
+        rebuilt only after they place another order.
+        """
+        with self._lock:
+            email = _norm_key(email)
+            postings = self.by_email.get(email, _EMPTY)
+            counted, favs = self._favorites.get(email, (None, None))
+            if counted != len(postings):
+                favs = self._item_stats(postings.pos)
+                self._favorites[email] = (len(postings), favs)
+            ranked = sorted(favs.items(), key=lambda kv: kv[1]["count"], reverse=True)[:n]
+            return [
+                {
+                    "item_code": code,
+                    "description": stats["description"],
+                    "brand": stats["brand"],
+                    "uom": stats["uoms"].most_common(1)[0][0],
+                    "quantity": stats["qtys"].most_common(1)[0][0],
+                    "times_ordered": stats["count"],
+                }
+                for code, stats in ranked
+            ]
+
+    def _intersect(self, postings, start, end) -> list:
+        """Positions in all postings within the date window, oldest first.
+
+        Walks the smallest windowed posting list and checks each candidate in
+        the others by bisecting its timestamp.
+        """
+        windows = sorted(((p.window(start, end), p) for p in postings), key=lambda w: w[0][1] - w[0][0])
+        (lo, hi), driver = windows[0]
+        others = [p for _, p in windows[1:]]
+        ts, pos = driver.ts, driver.pos
+        return [pos[i] for i in range(lo, hi) if all(p.contains(ts[i], pos[i]) for p in others)]
+
+    def search(self, start=None, end=None, email=None, company=None, item_code=None,
+               page: int = 0, page_size: int = 50):
+        """Return (total_matches, orders_on_page, page), newest first.
+
+        start/end are inclusive 'YYYY-MM-DD HH:MM:SS' strings; page is clamped
+        to the last available page.
+        """
+        with self._lock:
+            postings = []
+            if email:
+                postings.append(self.by_email.get(_norm_key(email), _EMPTY))
+            if company:
+                postings.append(self.by_company.get(_norm_key(company), _EMPTY))
+            if item_code:
+                postings.append(self.by_sku.get(_norm_sku(item_code), _EMPTY))
+
+            if len(postings) <= 1:
+                matched = postings[0] if postings else self.by_time
+                lo, hi = matched.window(start, end)
+                positions = matched.pos
+            else:
+                # Reruns and paging repeat the same query; keep its intersection
+                query = (_norm_key(email), _norm_key(company), _norm_sku(item_code), start, end)
+                if self._matches is None or self._matches[0] != query:
+                    self._matches = (query, self._intersect(postings, start, end))
+                positions = self._matches[1]
+                lo, hi = 0, len(positions)
+
+            total = hi - lo
+            page = max(0, min(page, (total - 1) // page_size if total else 0))
+            # Walk backwards from the newest match
+            top = hi - page * page_size
+            page_positions = positions[max(lo, top - page_size):top][::-1]
+            return total, [self.orders[p] for p in page_positions], page
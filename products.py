@@ -0,0 +1,89 @@
+"""Product table helpers shared by the admin upload, catalog sync and the catalog.
+
+Uploaded and synced sheets leave blank cells as NaN; every product is
+normalized to the same shape the compiled catalog (catalog_bin.py) stores, so
+a product reads the same whether it comes from products.json or products.bin.
+"""
+from catalog_bin import MappedCatalog
+
+TEXT_COLUMNS = ("item_code", "description", "brand", "image_path")
+NUMBER_COLUMNS = ("case_price", "each_price", "pack_size")
+FLAG_COLUMNS = ("allow_case", "allow_each")
+
+def _is_blank(value) -> bool:
+    return value is None or (isinstance(value, float) and value != value)
+
+def _text(value) -> str:
+    """Text cell as str ('' for blank/NaN)"""
+    return "" if _is_blank(value) else str(value)
+
+def _to_number(value):
+    """Parse an optional numeric cell ('$12.50', '1,200', blank/NaN → None)"""
+    if value is None:
+        return None
+    try:
+        num = float(str(value).replace("$", "").replace(",", "").strip())
+    except ValueError:
+        return None
+    return None if num != num else num  # NaN → None
+
+def _flag(value) -> bool:
+    """UOM flag cell; blank means allowed"""
+    return True if _is_blank(value) else bool(value)
+
+def normalize_product(product: dict) -> dict:
+    """Product dict with blank/NaN cells replaced by their stored defaults"""
+    normalized = {col: _text(product.get(col)) for col in TEXT_COLUMNS}
+    normalized["category"] = _text(product.get("category")) or "Uncategorized"
+    for col in FLAG_COLUMNS:
+        normalized[col] = _flag(product.get(col))
+    for col in NUMBER_COLUMNS:
+        normalized[col] = _to_number(product.get(col))
+    return normalized
+
+def normalize_products(products) -> list:
+    return [normalize_product(p) for p in products]
+
+def products_from_df(df) -> list:
+    """Convert an uploaded/synced product table to the stored product list"""
+    return [normalize_product(row) for _, row in df.iterrows()]
+
+def validate_products_df(df):
+    """Raise ValueError if a product table cannot replace the catalog"""
+    missing = [c for c in ("item_code", "description") if c not in df.columns]
+    if missing:
+        raise ValueError(f"missing column(s): {', '.join(missing)}")
+    if df.empty:
+        raise ValueError("product file has no rows")
+    codes = df["item_code"].astype(str).str.strip()
+    if (codes == "").any() or df["item_code"].isna().any():
+        raise ValueError("some rows have no item_code")
+    dupes = codes[codes.duplicated()].unique()
+    if len(dupes):
+        raise ValueError(f"duplicate item_code(s): {', '.join(dupes[:5])}")
+
+def product_categories(products) -> list:
+    """Sorted category names"""
+    if isinstance(products, MappedCatalog):
+        return products.categories()
+    return sorted({p["category"] for p in products})
+
+def filter_products(products, search_query: str, category: str):
+    """Catalog search + category filter (served from the compiled index when mapped)"""
+    if isinstance(products, MappedCatalog):
+        rows = products.search_rows(search_query) if search_query else range(len(products))
+        if category != "All":
+            in_category = set(products.category_rows(category))
+            rows = [r for r in rows if r in in_category]
+        return products if rows == range(len(products)) else [products[r] for r in rows]
+
+    filtered_products = products
+    if search_query:
+        query = search_query.lower()
+        filtered_products = [
+            p for p in filtered_products
+            if query in p["item_code"].lower() or query in p["description"].lower()
+        ]
+    if category != "All":
+        filtered_products = [p for p in filtered_products if p["category"] == category]
+    return filtered_products
@@ -0,0 +1,85 @@
+"""Serialization codecs for the persisted JSON stores (users, products, orders).
+
+Stores are written with DATA_CODEC ("json" = compact JSON, "orjson",
+"msgpack") and optionally compressed with DATA_COMPRESS ("gzip", "zstd").
+Reads detect the format from the file content, so existing pretty-printed
+JSON files keep loading and are converted on the next save.
+"""
+import gzip
+import json
+import os
+
+DATA_CODEC = os.getenv("DATA_CODEC", "json")
+DATA_COMPRESS = os.getenv("DATA_COMPRESS", "none")
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+_GZIP_MAGIC = b"\x1f\x8b"
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+_UTF8_BOM = b"\xef\xbb\xbf"
+
+class CodecUnavailableError(RuntimeError):
+    """A stored file needs an optional package that is not installed.
+
+    Callers must not treat this as a missing/corrupt file: falling back to an
+    empty default and saving would overwrite the stored data.
+    """
+
+def available_codecs() -> list:
+    return ["json"] + (["orjson"] if orjson else []) + (["msgpack"] if msgpack else [])
+
+def available_compressions() -> list:
+    return ["none", "gzip"] + (["zstd"] if zstandard else [])
+
+def encode_data(obj, codec: str = None, compress: str = None) -> bytes:
+    """Serialize obj with the given codec/compression (falls back to what is installed)"""
+    codec = codec or DATA_CODEC
+    compress = compress or DATA_COMPRESS
+    if codec == "msgpack" and msgpack:
+        data = msgpack.packb(obj, use_bin_type=True)
+    elif codec == "orjson" and orjson:
+        data = orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+    else:
+        data = json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    if compress == "zstd" and zstandard:
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    if compress in ("gzip", "zstd"):
+        return gzip.compress(data, compresslevel=6)
+    return data
+
+def decode_data(data: bytes):
+    """Deserialize bytes written by encode_data (or plain JSON), detecting the format"""
+    if data.startswith(_GZIP_MAGIC):
+        data = gzip.decompress(data)
+    elif data.startswith(_ZSTD_MAGIC):
+        if not zstandard:
+            raise CodecUnavailableError("zstd-compressed file but zstandard is not installed")
+        data = zstandard.ZstdDecompressor().decompressobj().decompress(data)
+
+    if data.startswith(_UTF8_BOM):
+        data = data[len(_UTF8_BOM):]  # JSON saved by editors such as Excel/Notepad
+
+    head = data[:64].lstrip()[:1]
+    if head and head[0] >= 0x80:
+        # msgpack maps/arrays start with a byte >= 0x80; JSON never does
+        if not msgpack:
+            raise CodecUnavailableError("msgpack file but msgpack is not installed")
+        return msgpack.unpackb(data, raw=False, strict_map_key=False)
+    if orjson:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass  # e.g. NaN written by the stdlib encoder
+    return json.loads(data.decode("utf-8"))
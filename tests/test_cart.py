@@ -0,0 +1,87 @@
+import pytest
+
+from cart import cart_keys, fmt_money, price_line, quote_cart, uom_allowed, unit_price
+from catalog_bin import MappedCatalog, compile_catalog
+from products import normalize_products
+
+def product(**fields):
+    return {"item_code": "B-0-01-009", "description": "Yogurt Coco 9 x 64 oz", "brand": " Paisa ",
+            "allow_case": True, "allow_each": True, "case_price": None, "each_price": None,
+            "pack_size": None, **fields}
+
+@pytest.mark.parametrize("fields, case, each", [
+    ({"case_price": 18.0, "each_price": 2.5, "pack_size": 9.0}, 18.0, 2.5),   # both given
+    ({"case_price": 18.0, "pack_size": 9.0}, 18.0, 2.0),                     # each from case
+    ({"each_price": 2.5, "pack_size": 12.0}, 30.0, 2.5),                     # case from each
+    ({"case_price": 18.0}, 18.0, None),                                      # no pack size
+    ({"each_price": 2.5, "pack_size": 0.0}, None, 2.5),
+    ({}, None, None),
+])
+def test_unit_price_derivation(fields, case, each):
+    assert unit_price(product(**fields), "Case") == case
+    assert unit_price(product(**fields), "Each") == each
+
+def test_uom_flags():
+    assert uom_allowed(product(), "Case") and uom_allowed(product(), "Each")
+    assert not uom_allowed(product(allow_case=False), "Case")
+    assert not uom_allowed(product(allow_each=False), "Each")
+    assert not uom_allowed(product(), "Pallet")
+
+def test_price_line_statuses():
+    assert price_line(None, "GONE", "Case", 2)["status"] == "removed"
+    assert price_line(product(allow_each=False), "B-0-01-009", "Each", 2)["status"] == "invalid_uom"
+
+    line = price_line(product(case_price=10.0, pack_size=3.0), "B-0-01-009", "Each", 7)
+    assert line["status"] == "ok" and line["brand"] == "Paisa"
+    assert (line["unit_price"], line["line_total"]) == (3.33, 23.33)
+
+    unpriced = price_line(product(), "B-0-01-009", "Case", 1)
+    assert unpriced["status"] == "ok" and unpriced["line_total"] is None
+
+def test_quote_totals_and_line_memo():
+    by_code = {
+        "A": product(item_code="A", case_price=12.0),
+        "B": product(item_code="B", each_price=1.25, allow_case=False),
+        "C": product(item_code="C"),
+    }
+    cart = {
+        "A": {"uom": "Case", "quantity": 2},
+        "B": {"uom": "Each", "quantity": "3"},
+        "C": {"uom": "Case", "quantity": 1},
+        "D": {"uom": "Case", "quantity": 1},
+    }
+    keys = cart_keys(cart)
+    assert keys[1] == ("B", "Each", 3)
+    line_cache = {}
+    quote = quote_cart(keys, 7, by_code, line_cache)
+    assert quote["version"] == 7
+    assert (quote["case_total"], quote["each_total"], quote["total"]) == (24.0, 3.75, 27.75)
+    assert [ln["item_code"] for ln in quote["valid"]] == ["A", "B", "C"]
+    assert [ln["status"] for ln in quote["invalid"]] == ["removed"]
+    assert quote["unpriced"] == 1
+
+    # Only the edited line is repriced
+    by_code["A"] = product(item_code="A", case_price=99.0)
+    cart["B"]["quantity"] = 4
+    requote = quote_cart(cart_keys(cart), 7, by_code, line_cache)
+    assert requote["lines"][0] is quote["lines"][0]
+    assert requote["each_total"] == 5.0
+
+def test_blank_cells_price_the_same_from_json_and_mapped_catalogs(tmp_path):
+    nan = float("nan")
+    products = normalize_products([
+        {"item_code": "A", "description": "Arepas", "brand": nan, "category": nan, "case_price": 10.0},
+        {"item_code": "B", "description": "Bocadillo", "brand": "Paisa", "each_price": "1.50", "pack_size": 24},
+    ])
+    compile_catalog(products, tmp_path / "products.bin")
+    mapped = MappedCatalog(tmp_path / "products.bin")
+    keys = (("A", "Case", 2), ("B", "Case", 1))
+
+    from_list = quote_cart(keys, 1, {p["item_code"]: p for p in products}, {})
+    from_mapped = quote_cart(keys, 1, mapped.by_code, {})
+    assert from_list == from_mapped
+    assert from_list["lines"][0]["brand"] == "" and from_list["total"] == 56.0
+
+def test_fmt_money():
+    assert fmt_money(None) == "—"
+    assert fmt_money(1234.5) == "$1,234.50"
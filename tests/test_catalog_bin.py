@@ -0,0 +1,81 @@
+import multiprocessing
+
+import pytest
+
+from catalog_bin import MappedCatalog, compile_catalog
+
+def make_products(n, tag=""):
+    return [
+        {
+            "item_code": f"B-0-01-{i:03d}",
+            "description": f"Yogurt Coco {i} x 64 oz{tag}",
+            "category": ["Beverages", "Cheese"][i % 2],
+            "brand": "Paisa",
+            "allow_case": True,
+            "allow_each": i % 3 == 0,
+            "image_path": "",
+            "case_price": 1.5 * i if i % 5 else None,
+            "each_price": None,
+            "pack_size": 9.0,
+        }
+        for i in range(n)
+    ]
+
+def test_round_trip_and_lookups(tmp_path):
+    products = make_products(50)
+    compile_catalog(products, tmp_path / "products.bin", (1, 2))
+    mapped = MappedCatalog(tmp_path / "products.bin")
+
+    assert list(mapped) == products
+    assert mapped.source_stamp == (1, 2)
+    assert mapped.by_code.get("B-0-01-007") == products[7]
+    assert mapped.by_code.get("missing") is None
+    assert list(mapped.category_rows("Cheese")) == list(range(1, 50, 2))
+    assert mapped.search_rows("coco 4") == [4] + list(range(40, 50))
+
+def _compile_many(path, tag, rounds):
+    for _ in range(rounds):
+        compile_catalog(make_products(2000, tag), path)
+
+def test_concurrent_compiles_never_publish_a_torn_file(tmp_path):
+    path = tmp_path / "products.bin"
+    ctx = multiprocessing.get_context("spawn")
+    workers = [ctx.Process(target=_compile_many, args=(path, tag, 5)) for tag in ("a", "bb")]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+        assert w.exitcode == 0
+
+    mapped = MappedCatalog(path)
+    assert len(mapped) == 2000
+    assert mapped[1999]["description"].endswith(("a", "bb"))
+    assert [p.name for p in tmp_path.iterdir()] == ["products.bin"]  # no temp files left
+
+def test_truncated_or_corrupt_files_are_rejected(tmp_path):
+    path = tmp_path / "products.bin"
+    compile_catalog(make_products(200), path)
+    data = path.read_bytes()
+
+    bad = tmp_path / "bad.bin"
+    for broken in (
+        data[:10],                       # cut inside the header length
+        data[:len(data) // 2],           # cut inside the sections
+        data[:-1],                       # last byte missing
+        data[:12] + b"{" * 40 + data[52:],  # garbled JSON header
+    ):
+        bad.write_bytes(broken)
+        with pytest.raises(ValueError):
+            MappedCatalog(bad)
+
+def test_missing_category_matches_postings(tmp_path):
+    products = make_products(4)
+    products[0]["category"] = ""
+    products[1]["category"] = float("nan")
+    del products[2]["category"]
+    compile_catalog(products, tmp_path / "products.bin")
+    mapped = MappedCatalog(tmp_path / "products.bin")
+
+    assert [p["category"] for p in mapped] == ["Uncategorized"] * 3 + ["Cheese"]
+    assert list(mapped.category_rows("Uncategorized")) == [0, 1, 2]
+    assert mapped.categories() == ["Cheese", "Uncategorized"]
@@ -0,0 +1,223 @@
+import os
+import threading
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from catalog_sync import CatalogSync
+
+GOOD = b"item_code,description\nB-0-01-009,Yogurt Coco 9 x 64 oz\n"
+CHANGED = b"item_code,description\nB-0-01-009,Yogurt Coco 9 x 32 oz\n"
+BAD = b"sku,name\nB-0-01-009,Yogurt Coco\n"
+
+class Recorder:
+    """Stand-in for apply_catalog_csv: validates the header and records applied versions."""
+
+    def __init__(self):
+        self.applied = []
+
+    def __call__(self, data: bytes):
+        if not data.startswith(b"item_code,"):
+            raise ValueError("missing column(s): item_code")
+        self.applied.append(data)
+
+def _write(path, data, mtime):
+    path.write_bytes(data)
+    os.utime(path, (mtime, mtime))
+
+@pytest.fixture
+def csv_sync(tmp_path):
+    path = tmp_path / "products.csv"
+    _write(path, GOOD, 1_000_000)
+    apply = Recorder()
+    return path, apply, CatalogSync(str(path), apply)
+
+def test_file_first_check_applies(csv_sync):
+    path, apply, sync = csv_sync
+    assert sync.check() is True
+    assert apply.applied == [GOOD]
+    assert sync.last_error is None and sync.last_synced is not None
+
+def test_file_unchanged_is_not_parsed(csv_sync):
+    path, apply, sync = csv_sync
+    sync.check()
+    assert sync.check() is False
+    assert apply.applied == [GOOD]
+
+def test_file_touched_but_same_content(csv_sync):
+    path, apply, sync = csv_sync
+    sync.check()
+    _write(path, GOOD, 2_000_000)
+    assert sync.check() is False
+    assert apply.applied == [GOOD]
+    assert sync.file_stamp == (2_000_000 * 10**9, len(GOOD))
+
+def test_file_changed_is_applied(csv_sync):
+    path, apply, sync = csv_sync
+    sync.check()
+    _write(path, CHANGED, 2_000_000)
+    assert sync.check() is True
+    assert apply.applied == [GOOD, CHANGED]
+
+def test_file_invalid_keeps_error_and_retries(csv_sync):
+    path, apply, sync = csv_sync
+    sync.check()
+    _write(path, BAD, 2_000_000)
+    assert sync.check() is False
+    assert "item_code" in sync.last_error
+
+    # Same broken content: still an error, and parsed again rather than skipped
+    assert sync.check() is False
+    assert "item_code" in sync.last_error
+    assert apply.applied == [GOOD]
+
+    _write(path, CHANGED, 3_000_000)
+    assert sync.check() is True
+    assert sync.last_error is None
+    assert apply.applied == [GOOD, CHANGED]
+
+def test_missing_file_reports_error(tmp_path):
+    sync = CatalogSync(str(tmp_path / "nope.csv"), Recorder())
+    assert sync.check() is False
+    assert sync.last_error
+
+class _CatalogServer:
+    """Local HTTP stand-in serving a CSV with ETag / Last-Modified validators."""
+
+    def __init__(self):
+        self.body = GOOD
+        self.version = 1
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                etag = f'"v{server.version}"'
+                last_modified = formatdate(1_000_000 + server.version, usegmt=True)
+                server.requests.append(dict(self.headers))
+                if self.headers.get("If-None-Match") == etag or \
+                        (not self.headers.get("If-None-Match") and
+                         self.headers.get("If-Modified-Since") == last_modified):
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("ETag", etag)
+                self.send_header("Last-Modified", last_modified)
+                self.send_header("Content-Length", str(len(server.body)))
+                self.end_headers()
+                self.wfile.write(server.body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = HTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}/products.csv"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def publish(self, body):
+        self.body = body
+        self.version += 1
+
+@pytest.fixture
+def server():
+    srv = _CatalogServer()
+    yield srv
+    srv.httpd.shutdown()
+    srv.httpd.server_close()
+
+def test_http_conditional_fetch(server):
+    apply = Recorder()
+    sync = CatalogSync(server.url, apply)
+    assert sync.check() is True
+    assert sync.etag == '"v1"' and sync.last_modified
+
+    # 304: nothing downloaded or parsed
+    assert sync.check() is False
+    assert server.requests[-1]["If-None-Match"] == '"v1"'
+    assert server.requests[-1]["If-Modified-Since"] == sync.last_modified
+    assert apply.applied == [GOOD]
+
+    server.publish(CHANGED)
+    assert sync.check() is True
+    assert sync.etag == '"v2"'
+    assert apply.applied == [GOOD, CHANGED]
+
+def test_http_invalid_version_is_retried(server):
+    apply = Recorder()
+    sync = CatalogSync(server.url, apply)
+    sync.check()
+    server.publish(BAD)
+
+    assert sync.check() is False
+    assert sync.last_error
+    # The failed version's ETag is not kept, so the next poll re-downloads it
+    assert sync.etag == '"v1"'
+    assert sync.check() is False
+    assert sync.last_error
+    assert server.requests[-1]["If-None-Match"] == '"v1"'
+
+    server.publish(CHANGED)
+    assert sync.check() is True
+    assert sync.last_error is None
+    assert apply.applied == [GOOD, CHANGED]
+
+def test_file_markers_survive_a_restart(tmp_path):
+    path, state = tmp_path / "products.csv", tmp_path / "catalog_sync.json"
+    _write(path, GOOD, 1_000_000)
+    first = Recorder()
+    assert CatalogSync(str(path), first, state_path=state).check() is True
+
+    # A new process (or another worker) with the same state does not re-apply
+    restarted = Recorder()
+    sync = CatalogSync(str(path), restarted, state_path=state)
+    assert sync.check() is False
+    assert restarted.applied == [] and sync.last_synced is not None
+
+    _write(path, GOOD, 2_000_000)  # touched, same content
+    assert sync.check() is False
+    _write(path, CHANGED, 3_000_000)
+    assert sync.check() is True
+    assert restarted.applied == [CHANGED]
+
+    # The first process picks up the markers its sibling saved
+    first_sync = CatalogSync(str(path), first, state_path=state)
+    assert first_sync.check() is False and first.applied == [GOOD]
+
+def test_state_of_another_source_is_ignored(tmp_path):
+    path, state = tmp_path / "products.csv", tmp_path / "catalog_sync.json"
+    _write(path, GOOD, 1_000_000)
+    CatalogSync(str(tmp_path / "old.csv"), Recorder(), state_path=state)._commit({"digest": "x"})
+    apply = Recorder()
+    assert CatalogSync(str(path), apply, state_path=state).check() is True
+    assert apply.applied == [GOOD]
+
+def test_failed_version_is_not_persisted(tmp_path):
+    path, state = tmp_path / "products.csv", tmp_path / "catalog_sync.json"
+    _write(path, GOOD, 1_000_000)
+    CatalogSync(str(path), Recorder(), state_path=state).check()
+    _write(path, BAD, 2_000_000)
+    assert CatalogSync(str(path), Recorder(), state_path=state).check() is False
+
+    restarted = CatalogSync(str(path), Recorder(), state_path=state)
+    assert restarted.check() is False
+    assert "item_code" in restarted.last_error  # retried after the restart, not skipped
+
+def test_http_markers_survive_a_restart(server, tmp_path):
+    state = tmp_path / "catalog_sync.json"
+    CatalogSync(server.url, Recorder(), state_path=state).check()
+
+    apply = Recorder()
+    assert CatalogSync(server.url, apply, state_path=state).check() is False
+    assert server.requests[-1]["If-None-Match"] == '"v1"'
+    assert apply.applied == []
+
+def test_error_clears_once_the_source_is_back_unchanged(csv_sync):
+    path, apply, sync = csv_sync
+    sync.check()
+    path.rename(path.with_suffix(".bak"))
+    assert sync.check() is False and sync.last_error
+    path.with_suffix(".bak").rename(path)
+    assert sync.check() is False
+    assert sync.last_error is None and apply.applied == [GOOD]
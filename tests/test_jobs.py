@@ -0,0 +1,216 @@
+import json
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+import jobs
+from jobs import JobQueue
+
+ORDER = {
+    "order_id": "ORD-20261019120000",
+    "timestamp": "2026-10-19 12:00:00",
+    "customer_name": "Ana Pérez",
+    "company_name": "Bodega Central",
+    "email": "ana@example.com",
+    "items": [{"item_code": "B-0-01-009", "description": "Yogurt Coco 9 x 64 oz", "uom": "Case", "quantity": 2}],
+}
+
+def make_queue(tmp_path, handlers, **kw):
+    kw.setdefault("max_attempts", 3)
+    kw.setdefault("backoff", 0.01)
+    return JobQueue(tmp_path / "jobs", workers=1, handlers=handlers, **kw)
+
+def drain(queue, timeout=5.0):
+    """Run jobs until pending/ and running/ are empty (including delayed retries)."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if not queue.run_once():
+            counts = queue.counts()
+            if not counts["pending"] and not counts["running"]:
+                return
+            time.sleep(0.005)
+    raise AssertionError(f"queue did not drain: {queue.counts()}")
+
+def test_enqueue_claim_success(tmp_path):
+    seen = []
+    queue = make_queue(tmp_path, {"echo": seen.append})
+    queue.enqueue("echo", {"n": 1})
+    queue.enqueue("echo", {"n": 2})
+    assert queue.counts() == {"pending": 2, "running": 0, "failed": 0}
+
+    drain(queue)
+    assert seen == [{"n": 1}, {"n": 2}]  # FIFO
+    assert queue.counts() == {"pending": 0, "running": 0, "failed": 0}
+
+def test_retry_with_backoff_then_success(tmp_path):
+    calls = []
+
+    def flaky(payload):
+        calls.append(time.monotonic())
+        if len(calls) < 3:
+            raise ConnectionError("ERP down")
+
+    queue = make_queue(tmp_path, {"flaky": flaky}, max_attempts=5, backoff=0.05)
+    queue.enqueue("flaky", {})
+    drain(queue)
+
+    assert len(calls) == 3
+    # Exponential backoff: ~0.05s, then ~0.1s
+    assert calls[1] - calls[0] >= 0.05
+    assert calls[2] - calls[1] >= 0.1
+    assert queue.counts()["failed"] == 0
+
+def test_moves_to_failed_after_max_attempts(tmp_path):
+    queue = make_queue(tmp_path, {"boom": lambda p: 1 / 0}, max_attempts=3)
+    queue.enqueue("boom", {"x": 1})
+    drain(queue)
+
+    assert queue.counts() == {"pending": 0, "running": 0, "failed": 1}
+    job = json.loads(next(queue.failed.glob("*.json")).read_text(encoding="utf-8"))
+    assert job["attempts"] == 3
+    assert job["error"].startswith("ZeroDivisionError")
+    assert job["payload"] == {"x": 1}
+
+def test_retry_failed_requeues(tmp_path):
+    outcomes = [ZeroDivisionError, ZeroDivisionError, None]
+    seen = []
+
+    def handler(payload):
+        err = outcomes.pop(0)
+        if err:
+            raise err()
+        seen.append(payload)
+
+    queue = make_queue(tmp_path, {"job": handler}, max_attempts=2)
+    queue.enqueue("job", {"x": 1})
+    drain(queue)
+    assert queue.counts()["failed"] == 1
+
+    assert queue.retry_failed() == 1
+    drain(queue)
+    assert seen == [{"x": 1}]
+    assert queue.counts() == {"pending": 0, "running": 0, "failed": 0}
+
+def test_malformed_jobs_go_to_failed(tmp_path):
+    seen = []
+    queue = make_queue(tmp_path, {"echo": seen.append})
+    (queue.pending / "not-a-job.json").write_text("{}", encoding="utf-8")
+    (queue.pending / f"{0:020d}-broken.json").write_text("{not json", encoding="utf-8")
+    queue.enqueue("echo", {"n": 1})
+
+    drain(queue)
+    assert seen == [{"n": 1}]
+    assert sorted(p.name for p in queue.failed.glob("*.json")) == [f"{0:020d}-broken.json", "not-a-job.json"]
+    assert queue.retry_failed() == 0  # neither is a job; both stay in failed/
+    assert queue.counts() == {"pending": 0, "running": 0, "failed": 2}
+
+def test_retry_failed_does_not_stack_due_prefixes(tmp_path):
+    queue = make_queue(tmp_path, {})
+    job = {"id": "job-abc", "kind": "job", "payload": {}, "attempts": 5, "error": "boom"}
+    (queue.failed / f"{5:020d}-job-abc.json").write_text(json.dumps(job), encoding="utf-8")
+
+    for _ in range(2):
+        assert queue.retry_failed() == 1
+        (requeued,) = queue.pending.glob("*.json")
+        assert requeued.name[21:] == "job-abc.json"
+        assert json.loads(requeued.read_text(encoding="utf-8"))["attempts"] == 0
+        requeued.rename(queue.failed / requeued.name)
+
+def test_worker_threads_survive_bad_files(tmp_path):
+    seen = []
+    queue = make_queue(tmp_path, {"echo": seen.append})
+    (queue.pending / "junk.json").write_text("{}", encoding="utf-8")
+    queue.start()
+    try:
+        queue.enqueue("echo", {"n": 1})
+        deadline = time.time() + 5
+        while not seen and time.time() < deadline:
+            time.sleep(0.01)
+        assert seen == [{"n": 1}]
+        assert all(t.is_alive() for t in queue._threads)
+    finally:
+        queue.stop()
+
+class _SMTPStandIn(socketserver.StreamRequestHandler):
+    """Minimal SMTP server that records each message body."""
+
+    def handle(self):
+        self.wfile.write(b"220 localhost ESMTP\r\n")
+        in_data, lines = False, []
+        for raw in self.rfile:
+            if in_data:
+                if raw == b".\r\n":
+                    self.server.messages.append(b"".join(lines).decode("utf-8"))
+                    in_data, lines = False, []
+                    self.wfile.write(b"250 queued\r\n")
+                else:
+                    lines.append(raw)
+                continue
+            cmd = raw[:4].upper()
+            if cmd == b"DATA":
+                in_data = True
+                self.wfile.write(b"354 go ahead\r\n")
+            elif cmd == b"QUIT":
+                self.wfile.write(b"221 bye\r\n")
+                return
+            else:
+                self.wfile.write(b"250 ok\r\n")
+
+@pytest.fixture
+def smtp_server(monkeypatch):
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _SMTPStandIn)
+    server.messages = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(jobs, "SMTP_HOST", "127.0.0.1")
+    monkeypatch.setattr(jobs, "SMTP_PORT", server.server_address[1])
+    monkeypatch.setattr(jobs, "ORDER_NOTIFY_EMAIL", "warehouse@example.com")
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def test_email_handler_sends_order(tmp_path, smtp_server):
+    queue = make_queue(tmp_path, jobs.JOB_HANDLERS)
+    queue.enqueue("order_email", {"order": ORDER})
+    drain(queue)
+
+    assert queue.counts()["failed"] == 0
+    (message,) = smtp_server.messages
+    assert "Subject: Tany Foods order ORD-20261019120000" in message
+    assert "To: ana@example.com, warehouse@example.com" in message
+    assert "B-0-01-009" in message
+
+@pytest.fixture
+def webhook_server(monkeypatch):
+    received = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            received.append((self.headers["Content-Type"], json.loads(body)))
+            self.send_response(200 if len(received) > 1 else 503)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(jobs, "ORDER_WEBHOOK_URL", f"http://127.0.0.1:{server.server_port}/orders")
+    yield received
+    server.shutdown()
+    server.server_close()
+
+def test_webhook_handler_posts_order_and_retries(tmp_path, webhook_server):
+    queue = make_queue(tmp_path, jobs.JOB_HANDLERS)
+    queue.enqueue("order_webhook", {"order": ORDER})
+    drain(queue)
+
+    # First POST gets a 503 and is retried
+    assert len(webhook_server) == 2
+    content_type, body = webhook_server[-1]
+    assert content_type == "application/json"
+    assert body == ORDER
+    assert queue.counts()["failed"] == 0
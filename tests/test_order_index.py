@@ -0,0 +1,143 @@
+import pytest
+
+from order_index import OrderIndex
+
+def make_order(i, email="ana@example.com", company="Tienda Ana", items=("B-0-01-001",), ts=None):
+    return {
+        "order_id": f"ORD-{i:04d}",
+        "timestamp": ts or f"2026-03-{1 + i // 24:02d} {i % 24:02d}:00:00",
+        "customer_name": email.split("@")[0],
+        "company_name": company,
+        "email": email,
+        "items": [{"item_code": code, "description": code, "brand": "Paisa", "uom": "Case", "quantity": 1}
+                  for code in items],
+    }
+
+def ids(orders):
+    return [int(o["order_id"][4:]) for o in orders]
+
+@pytest.fixture
+def index():
+    orders = []
+    for i in range(100):
+        orders.append(make_order(
+            i,
+            email=["ana@example.com", "luis@example.com"][i % 2],
+            company=["Tienda Ana", "Super Luis", "Mercado Sol"][i % 3],
+            items=("B-0-01-001", "Q-2-05-010") if i % 5 == 0 else ("S-1-03-100",),
+        ))
+    idx = OrderIndex()
+    idx.sync(orders)
+    return idx
+
+def test_unfiltered_pages_newest_first(index):
+    total, orders, page = index.search(page_size=30)
+    assert (total, page) == (100, 0)
+    assert ids(orders) == list(range(99, 69, -1))
+
+    total, orders, page = index.search(page=3, page_size=30)
+    assert (total, page) == (100, 3)
+    assert ids(orders) == list(range(9, -1, -1))
+
+def test_page_is_clamped(index):
+    assert index.search(page=99, page_size=30)[2] == 3
+    assert index.search(page=-2, page_size=30)[2] == 0
+    assert index.search(email="nobody@example.com", page=5) == (0, [], 0)
+
+def test_timestamp_range_is_inclusive(index):
+    # Order 30 is at 2026-03-02 06:00:00, order 40 at 2026-03-02 16:00:00
+    total, orders, _ = index.search(start="2026-03-02 06:00:00", end="2026-03-02 16:00:00")
+    assert total == 11
+    assert ids(orders) == list(range(40, 29, -1))
+
+    total, orders, _ = index.search(start="2026-03-02 06:00:01", end="2026-03-02 15:59:59")
+    assert ids(orders) == list(range(39, 30, -1))
+
+    assert index.search(start="2026-03-05 04:00:00")[0] == 0  # after the last order
+    assert index.search(end="2026-03-01 00:00:00")[0] == 1
+
+def test_single_filter(index):
+    total, orders, _ = index.search(email="LUIS@example.com ", page_size=10)
+    assert total == 50
+    assert ids(orders) == list(range(99, 79, -2))
+
+    total, orders, _ = index.search(item_code="q-2-05-010", page=1, page_size=5)
+    assert total == 20
+    assert ids(orders) == [70, 65, 60, 55, 50]
+
+def test_filters_are_intersected(index):
+    # Even i, i % 3 == 0 and i % 5 == 0 → multiples of 30
+    total, orders, _ = index.search(email="ana@example.com", company="Tienda Ana", item_code="B-0-01-001")
+    assert total == 4
+    assert ids(orders) == [90, 60, 30, 0]
+
+    total, orders, _ = index.search(email="ana@example.com", company="Tienda Ana",
+                                    start="2026-03-02 00:00:00", end="2026-03-03 23:59:59")
+    assert ids(orders) == [66, 60, 54, 48, 42, 36, 30, 24]
+
+    assert index.search(email="ana@example.com", item_code="S-1-03-100", company="Nadie")[0] == 0
+
+def test_out_of_order_appends_stay_sorted():
+    idx = OrderIndex()
+    orders = [make_order(i) for i in range(5)]
+    orders.append(make_order(5, ts="2026-03-01 02:30:00"))  # imported late
+    idx.sync(orders)
+    for filters in ({}, {"email": "ana@example.com"}):
+        _, found, _ = idx.search(**filters)
+        assert ids(found) == [4, 3, 5, 2, 1, 0]
+
+def test_sync_appends_and_rebuilds_after_rewrite(index):
+    orders = list(index.orders) + [make_order(100, email="new@example.com")]
+    index.sync(orders)
+    assert index.search(email="new@example.com")[0] == 1
+    assert index.search()[0] == 101
+
+    # orders.json rewritten with fewer orders: rebuilt from scratch
+    index.sync(orders[:10])
+    assert index.search()[0] == 10
+    assert index.search(email="new@example.com")[0] == 0
+
+def test_equal_timestamps_and_repeated_queries():
+    idx = OrderIndex()
+    orders = [make_order(i, email=["ana@example.com", "luis@example.com"][i % 2],
+                         items=("B-0-01-001",) if i % 3 else ("S-1-03-100",), ts="2026-03-01 08:00:00")
+              for i in range(12)]
+    idx.sync(orders)
+    query = {"email": "luis@example.com", "item_code": "B-0-01-001"}
+    assert ids(idx.search(**query)[1]) == [11, 7, 5, 1]
+    assert ids(idx.search(**query, page=1, page_size=3)[1]) == [1]
+
+    # A new order must not be hidden by the remembered intersection
+    idx.sync(orders + [make_order(12, email="luis@example.com", ts="2026-03-01 08:00:00")])
+    assert ids(idx.search(**query)[1]) == [12, 11, 7, 5, 1]
+
+def _line(code, uom="Case", quantity=1, description="", brand=""):
+    return {"item_code": code, "description": description, "brand": brand, "uom": uom, "quantity": quantity}
+
+def test_top_items_ranking_and_usual_uom_and_quantity():
+    orders = [make_order(i) for i in range(4)]
+    orders[0]["items"] = [_line("A", "Case", 2, "Arepas", "Paisa"), _line("B", "Each", 1)]
+    orders[1]["items"] = [_line("A", "Each", 2), _line("C", "Case", 5)]
+    orders[2]["items"] = [_line("A", "Case", 3, "Arepas 5 pk"), _line("B", "Each", 6)]
+    orders[3]["items"] = [_line("A", "Case", 2)]
+    orders.append(make_order(4, email="luis@example.com", items=("C", "C2", "C3")))
+    idx = OrderIndex()
+    idx.sync(orders)
+
+    top = idx.top_items("Ana@Example.com")
+    assert [(t["item_code"], t["times_ordered"]) for t in top] == [("A", 4), ("B", 2), ("C", 1)]
+    assert top[0] == {"item_code": "A", "description": "Arepas 5 pk", "brand": "Paisa",
+                      "uom": "Case", "quantity": 2, "times_ordered": 4}
+    assert (top[1]["uom"], top[1]["quantity"]) == ("Each", 1)  # tie on quantity: first seen wins
+    assert [t["item_code"] for t in idx.top_items("ana@example.com", n=2)] == ["A", "B"]
+    assert idx.top_items("nobody@example.com") == []
+
+def test_top_items_follow_new_orders():
+    idx = OrderIndex()
+    orders = [make_order(0, items=("A",))]
+    idx.sync(orders)
+    assert [t["item_code"] for t in idx.top_items("ana@example.com")] == ["A"]
+
+    orders += [make_order(1, items=("B",)), make_order(2, items=("B",))]
+    idx.sync(orders)
+    assert [(t["item_code"], t["times_ordered"]) for t in idx.top_items("ana@example.com")] == [("B", 2), ("A", 1)]
@@ -0,0 +1,56 @@
+from io import StringIO
+
+import pytest
+
+from catalog_bin import MappedCatalog, compile_catalog
+from products import (filter_products, normalize_product, normalize_products, product_categories,
+                      products_from_df)
+
+def test_blank_cells_get_stored_defaults():
+    nan = float("nan")
+    product = normalize_product({
+        "item_code": "B-0-01-009", "description": nan, "category": nan, "brand": nan,
+        "image_path": None, "allow_case": nan, "allow_each": False,
+        "case_price": "$1,200.50", "each_price": nan, "pack_size": "",
+    })
+    assert product == {
+        "item_code": "B-0-01-009", "description": "", "category": "Uncategorized", "brand": "",
+        "image_path": "", "allow_case": True, "allow_each": False,
+        "case_price": 1200.5, "each_price": None, "pack_size": None,
+    }
+
+def test_products_from_df_has_no_nan():
+    pd = pytest.importorskip("pandas")
+    df = pd.read_csv(StringIO(
+        "item_code,description,brand,category,case_price\n"
+        "B-0-01-009,Yogurt Coco 9 x 64 oz,Paisa,Dairy,12.5\n"
+        "B-0-01-010,Yogurt Mora 9 x 64 oz,,,\n"
+    ))
+    products = products_from_df(df)
+    assert products[1]["brand"] == "" and products[1]["category"] == "Uncategorized"
+    assert products[1]["case_price"] is None
+    assert products[0]["case_price"] == 12.5
+    assert all(isinstance(p[col], str) for p in products
+               for col in ("item_code", "description", "brand", "category", "image_path"))
+
+def test_list_and_mapped_catalogs_agree(tmp_path):
+    nan = float("nan")
+    raw = [
+        {"item_code": "F-1", "description": "Mango Pulp", "category": "Fruit", "brand": "Paisa",
+         "allow_case": True, "allow_each": True, "image_path": "", "case_price": 10.0,
+         "each_price": None, "pack_size": 12.0},
+        {"item_code": "F-2", "description": "Guava Pulp", "category": nan, "brand": nan,
+         "allow_case": True, "allow_each": nan, "image_path": nan, "case_price": nan,
+         "each_price": 1.25, "pack_size": nan},
+        {"item_code": "F-3", "description": "mango nectar", "brand": " Goya "},
+    ]
+    products = normalize_products(raw)
+    compile_catalog(products, tmp_path / "products.bin")
+    mapped = MappedCatalog(tmp_path / "products.bin")
+
+    assert list(mapped) == products
+    assert product_categories(mapped) == product_categories(products) == ["Fruit", "Uncategorized"]
+    for query, category in [("", "All"), ("", "Uncategorized"), ("MANGO", "All"),
+                            ("mango", "Uncategorized"), ("f-", "Fruit"), ("kiwi", "All")]:
+        assert list(filter_products(mapped, query, category)) == filter_products(products, query, category)
+    assert len(filter_products(products, "", "Uncategorized")) == 2
@@ -0,0 +1,36 @@
+import gzip
+import json
+
+import pytest
+
+import storage
+from storage import CodecUnavailableError, decode_data, encode_data
+
+ORDERS = [{"order_id": "ORD-1", "customer_name": "José Peña", "items": [{"item_code": "B-0-01-009", "quantity": 2}]}]
+
+@pytest.mark.parametrize("codec", storage.available_codecs())
+@pytest.mark.parametrize("compress", storage.available_compressions())
+def test_round_trip(codec, compress):
+    assert decode_data(encode_data(ORDERS, codec, compress)) == ORDERS
+
+def test_reads_legacy_pretty_json():
+    legacy = json.dumps(ORDERS, ensure_ascii=False, indent=2).encode("utf-8")
+    assert decode_data(legacy) == ORDERS
+
+def test_reads_json_with_utf8_bom():
+    assert decode_data(b"\xef\xbb\xbf[1]") == [1]
+    assert decode_data(gzip.compress(b"\xef\xbb\xbf" + json.dumps(ORDERS).encode())) == ORDERS
+
+def test_compact_json_is_smaller_than_legacy():
+    legacy = json.dumps(ORDERS, ensure_ascii=False, indent=2).encode("utf-8")
+    assert len(encode_data(ORDERS, "json", "none")) < len(legacy)
+
+def test_missing_msgpack_is_not_a_decode_failure(monkeypatch):
+    monkeypatch.setattr(storage, "msgpack", None)
+    with pytest.raises(CodecUnavailableError):
+        decode_data(b"\x91\x01")  # msgpack for [1]
+
+def test_missing_zstandard_is_not_a_decode_failure(monkeypatch):
+    monkeypatch.setattr(storage, "zstandard", None)
+    with pytest.raises(CodecUnavailableError):
+        decode_data(b"\x28\xb5\x2f\xfd" + b"\x00" * 8)